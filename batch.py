@@ -1,7 +1,11 @@
 # batch_runner.py
 
-from db import SessionLocal
-from services import market_service, financial_service, stock_service, ohlcv_service, sector_service
+import os
+from services.stage_graph import Stage, run_stage_graph
+from services import market_service, financial_service, stock_service, ohlcv_service, sector_service, ohlcv_resample_service, indicator_service, return_service
+
+# 동시에 실행할 최대 단계 수 (단계마다 DB 커넥션을 하나씩 사용)
+BATCH_MAX_PARALLEL_STAGES = int(os.getenv("BATCH_MAX_PARALLEL_STAGES", 4))
 
 def load_symbols_from_txt(path: str) -> list[str]:
     with open(path, "r", encoding="utf-8") as f:
@@ -9,35 +13,43 @@ def load_symbols_from_txt(path: str) -> list[str]:
         symbols = [s.strip() for s in line.split(",") if s.strip()]
         return symbols
 
-def run_batch_job(symbol_txt_path: str = "./static/symbols.txt") -> None:
+def build_batch_stages(symbols: list[str]) -> list[Stage]:
+    """
+    배치 단계 그래프
+    - 프로필(stock 테이블)이 있어야 OHLCV/재무 저장 가능
+    - 주봉/월봉, 지표, 기간 수익률, 섹터 수익률은 저장된 일봉으로 로컬 계산
+    - 섹터 수익률의 시가총액 가중치는 저장된 재무 데이터(marketCap) 사용 (재무 수집 단계를 기다리지 않음,
+      marketCap이 없는 섹터는 동일 가중)
+    """
+    return [
+        Stage("profiles", lambda session, results: stock_service.collect_stock_profiles_yf(session, symbols),
+              retries=2),
+        Stage("market", lambda session, results: market_service.collect_all_market_metrics(session),
+              retries=2),
+        Stage("ohlcv_daily", lambda session, results: ohlcv_service.collect_ohlcv_daily(session, symbols),
+              deps=["profiles"], retries=1),
+        Stage("ohlcv_resample",
+              lambda session, results: ohlcv_resample_service.resample_weekly_monthly(session, results["ohlcv_daily"]),
+              deps=["ohlcv_daily"], retries=1),
+        Stage("indicators", lambda session, results: indicator_service.compute_indicators(session, symbols),
+              deps=["ohlcv_daily"], retries=1),
+        Stage("returns", lambda session, results: return_service.collect_return_matrix(session, symbols),
+              deps=["ohlcv_daily"], retries=1),
+        Stage("financials", lambda session, results: financial_service.collect_missing_financials(session, symbols),
+              deps=["profiles"], retries=1),
+        Stage("sector", lambda session, results: sector_service.collect_sector_performance(session),
+              deps=["ohlcv_daily"], retries=1),
+    ]
+
+def run_batch_job(symbol_txt_path: str = "./static/symbols.txt") -> dict:
+    """
+    배치 단계를 의존성 순서대로, 서로 독립적인 단계는 동시에 실행
+    Returns: {단계 이름: StageReport}
+    """
     symbols = load_symbols_from_txt(symbol_txt_path)
     # symbols=symbols[:2]
 
-    session = SessionLocal()
-    try:
-        print("📦 종목 기본 정보 수집 시작...")
-        stock_service.collect_stock_profiles_yf(session, symbols)
-        print("✅ 종목 기본 정보 수집 완료.")
-
-        market_service.collect_all_market_metrics(session)
-        print("✅ 시장 데이터 수집 완료")
-
-        sector_service.collect_sector_performance(session)
-        print("✅ 섹터 수익률 수집 완료")
-
-        ohlcv_service.collect_ohlcv_daily(session, symbols)
-        ohlcv_service.collect_ohlcv_weekly(session, symbols)
-        ohlcv_service.collect_ohlcv_monthly(session, symbols)
-        print("✅ OHLCV 수집 완료")
-
-        financial_service.collect_missing_financials(session, symbols)
-        print("✅ FMP 재무 데이터 수집 완료")
-
-    except Exception as e:
-        print(f"❌ 배치 오류 발생: {e}")
-        session.rollback()
-    finally:
-        session.close()
+    return run_stage_graph(build_batch_stages(symbols), max_workers=BATCH_MAX_PARALLEL_STAGES)
 
 if __name__ == "__main__":
     run_batch_job()
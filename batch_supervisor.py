@@ -0,0 +1,101 @@
+# batch_supervisor.py
+
+"""
+야간 배치를 별도 프로세스로 실행/감시
+- spawn 방식으로 새 인터프리터를 띄우므로 DB 엔진/커넥션 풀, 스레드 풀은 자식 프로세스에서 새로 생성됨
+- 실행 중인 배치가 있으면 새 실행 요청을 거부 (중복 실행 방지)
+- 메인 루프는 배치를 기다리지 않고 실시간 수집 주기를 그대로 유지
+"""
+
+import multiprocessing
+import signal
+import sys
+import time
+from datetime import date
+
+
+def run_batch_worker(symbol_txt_path: str) -> None:
+    """
+    배치 프로세스 진입점 (실패한 단계가 있으면 종료 코드 1)
+    """
+    # spawn된 자식이 __mp_main__으로 다시 import하면서 등록했을 수 있는 부모의 종료 핸들러 해제
+    # → terminate() 시 정상 종료(exit 0)로 처리되지 않고 바로 종료됨
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    from batch import run_batch_job  # 서비스 모듈은 자식 프로세스에서만 로딩
+
+    reports = run_batch_job(symbol_txt_path)
+    failed = [name for name, report in reports.items() if report.status != "success"]
+    sys.exit(1 if failed else 0)
+
+
+class BatchSupervisor:
+    def __init__(self, symbol_txt_path: str = "./static/symbols.txt"):
+        self.symbol_txt_path = symbol_txt_path
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.batch_day: date | None = None
+        self.started_at: float | None = None
+        self.terminated = False  # stop()으로 중단한 실행은 종료 코드와 관계없이 실패 처리
+        self.last_status = "idle"  # idle | running | succeeded | failed
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self, batch_day: date) -> bool:
+        """
+        배치 프로세스 시작 (이미 실행 중이면 False)
+        """
+        if self.is_running():
+            elapsed = time.monotonic() - self.started_at
+            print(f"⏳ {self.batch_day} 배치가 아직 실행 중 ({elapsed / 60:.0f}분 경과) → {batch_day} 배치 요청 거부")
+            return False
+
+        self.poll()  # 끝난 이전 실행 정리
+        self.process = self.context.Process(
+            target=run_batch_worker,
+            args=(self.symbol_txt_path,),
+            name=f"batch-{batch_day}",
+        )
+        self.process.start()
+        self.batch_day = batch_day
+        self.started_at = time.monotonic()
+        self.terminated = False
+        self.last_status = "running"
+        print(f"🌙 {batch_day} 배치 프로세스 시작 (pid={self.process.pid})")
+        return True
+
+    def poll(self) -> str:
+        """
+        실행 중인 배치가 끝났으면 결과를 기록하고 현재 상태 반환
+        """
+        if self.process is None or self.process.is_alive():
+            return self.last_status
+
+        self.process.join()
+        elapsed = time.monotonic() - self.started_at
+        exitcode = self.process.exitcode
+        succeeded = exitcode == 0 and not self.terminated
+        self.last_status = "succeeded" if succeeded else "failed"
+        icon = "✅" if succeeded else "❌"
+        reason = ", 중단됨" if self.terminated else ""
+        print(f"{icon} {self.batch_day} 배치 프로세스 종료 (exit={exitcode}{reason}, {elapsed / 60:.1f}분)")
+        self.process.close()
+        self.process = None
+        return self.last_status
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        메인 프로세스 종료 시 배치 프로세스도 정리
+        """
+        if not self.is_running():
+            return
+        print(f"🛑 {self.batch_day} 배치 프로세스 종료 요청 (pid={self.process.pid})")
+        self.terminated = True
+        self.process.terminate()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.poll()
@@ -1,10 +1,11 @@
 # collectors/fmp_financial_collector.py
 
 import os
-import requests
+from collectors import http
 from datetime import datetime
 from dotenv import load_dotenv
-from itertools import cycle
+from collectors.key_pool import ApiKeyPool, parse_retry_after
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from datetime import datetime
 from time import sleep
@@ -13,16 +14,36 @@ from time import sleep
 load_dotenv()
 API_KEYS = os.getenv("FMP_API_KEYS", "").split(",")
 FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
-api_key_cycle = cycle(API_KEYS)
 
-def get_next_api_key():
-    return next(api_key_cycle)
+# 키별 분당/일일 호출 한도
+FMP_CALLS_PER_MIN = int(os.getenv("FMP_API_CALLS_PER_MIN", 300))
+FMP_CALLS_PER_DAY = int(os.getenv("FMP_API_CALLS_PER_DAY", 250))
+key_pool = ApiKeyPool("fmp", API_KEYS, per_minute=FMP_CALLS_PER_MIN, per_day=FMP_CALLS_PER_DAY)
 
-def fetch_json(url):
+# 종목 하나의 metrics/profile 요청을 동시에 보내기 위한 풀 (종목 단위 풀과 분리하여 교착 방지)
+endpoint_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fmp-endpoint")
+
+def get_next_api_key(calls: int = 1):
+    return key_pool.acquire(calls)
+
+def report_rate_limited(api_key: str, response) -> None:
+    """
+    429 응답이면 키를 제외 (일일 한도 초과 메시지면 UTC 자정까지)
+    """
+    if response.status_code != 429:
+        return
+    if "Limit Reach" in response.text:
+        key_pool.report_exhausted(api_key)
+    else:
+        key_pool.report_rate_limited(api_key, parse_retry_after(response.headers.get("Retry-After")))
+
+def fetch_json(url, api_key: str | None = None):
     try:
-        response = requests.get(url, timeout=10)
+        response = http.get(url)
         if response.ok:
             return response.json()
+        if api_key:
+            report_rate_limited(api_key, response)
     except Exception as e:
         print(f"❌ 요청 실패: {url} → {e}")
     return None
@@ -60,14 +81,16 @@ def safe_divide(numerator: float, denominator: float) -> float:
 
 def collect_fmp_stock_financials(symbol: str, target_date: datetime) -> dict:
     print(f"📦 {symbol} 재무지표 수집 시작")
-    api_key = get_next_api_key()
+    api_key = get_next_api_key(calls=2)  # metrics + profile
     normalized = normalize_fmp_symbol(symbol)
 
     url_metrics = f"{FMP_BASE_URL}/key-metrics-ttm/{normalized}?apikey={api_key}"
     url_profile = f"{FMP_BASE_URL}/profile/{normalized}?apikey={api_key}"
 
-    metrics_data = fetch_json(url_metrics)
-    profile_data = fetch_json(url_profile)
+    metrics_future = endpoint_executor.submit(fetch_json, url_metrics, api_key)
+    profile_future = endpoint_executor.submit(fetch_json, url_profile, api_key)
+    metrics_data = metrics_future.result()
+    profile_data = profile_future.result()
     
     print(f"📡 요청 URL (metrics): {url_metrics}")
     print("📄 응답 본문 (metrics):")
@@ -126,7 +149,7 @@ def fetch_sector_performance_from_fmp(max_retries: int = 3) -> List[Dict]:
         url = f"{FMP_BASE_URL}/sectors-performance?apikey={api_key}"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = http.get(url)
             
             print(f"📡 요청 URL: {url}")
             print(f"📦 응답 상태코드: {response.status_code}")
@@ -135,6 +158,7 @@ def fetch_sector_performance_from_fmp(max_retries: int = 3) -> List[Dict]:
             
             if response.status_code != 200:
                 print(f"❌ 요청 실패: {response.status_code} - {response.text}")
+                report_rate_limited(api_key, response)
                 continue
 
             data = response.json()
@@ -1,7 +1,7 @@
 # collectors/market_collector.py
 
 import os
-import requests
+from collectors import http
 from dotenv import load_dotenv
 from datetime import date
 
@@ -26,7 +26,7 @@ def fetch_vix_range(start_date: date, end_date: date) -> list[dict]:
         "observation_end": end_date.isoformat(),
     }
 
-    response = requests.get(FRED_URL, params=params)
+    response = http.get(FRED_URL, params=params)
     if response.status_code != 200:
         raise RuntimeError(f"FRED 요청 실패: {response.status_code} {response.text}")
 
@@ -63,7 +63,7 @@ def fetch_fed_rate_range(start_date: date, end_date: date) -> list[dict]:
         "observation_end": end_date.isoformat(),
     }
 
-    response = requests.get(FRED_URL, params=params)
+    response = http.get(FRED_URL, params=params)
     if response.status_code != 200:
         raise RuntimeError(f"FRED 요청 실패: {response.status_code} {response.text}")
 
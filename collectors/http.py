@@ -0,0 +1,78 @@
+# collectors/http.py
+
+"""
+수집기 공용 HTTP 클라이언트
+- 호스트별 keep-alive 커넥션 풀 (requests.Session 재사용)
+- 기본 timeout, gzip 요청
+- 429/5xx 응답 시 jitter 포함 지수 backoff 재시도 (Retry-After 헤더 우선)
+  단, API 키 풀을 쓰는 호스트는 429를 재시도하지 않고 그대로 반환 → 키 풀이 해당 키를 제외하고 다른 키로 교체
+- 호스트별 동시 요청 수 제한
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+
+# (connect, read) timeout 초
+DEFAULT_TIMEOUT = (5, 30)
+
+# 호스트별 동시 요청 상한 (커넥션 풀 크기와 동일하게 사용)
+HOST_CONCURRENCY = {
+    "financialmodelingprep.com": 8,
+    "api.stlouisfed.org": 2,
+    "api.twelvedata.com": 16,
+}
+DEFAULT_CONCURRENCY = 8
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# ApiKeyPool로 키를 돌려 쓰는 호스트 (429는 같은 키로 재시도하지 않음)
+KEY_POOL_HOSTS = {"financialmodelingprep.com", "api.twelvedata.com"}
+
+_sessions: dict[str, requests.Session] = {}
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_lock = threading.Lock()
+
+
+def build_session(pool_size: int, retry_status: tuple[int, ...] = RETRY_STATUS) -> requests.Session:
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        status_forcelist=retry_status,
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_host_session(host: str) -> tuple[requests.Session, threading.BoundedSemaphore]:
+    """
+    호스트별 세션과 동시 요청 제한용 세마포어 반환 (최초 호출 시 생성)
+    """
+    with _lock:
+        if host not in _sessions:
+            limit = HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY)
+            retry_status = tuple(s for s in RETRY_STATUS if s != 429) if host in KEY_POOL_HOSTS else RETRY_STATUS
+            _sessions[host] = build_session(limit, retry_status)
+            _semaphores[host] = threading.BoundedSemaphore(limit)
+        return _sessions[host], _semaphores[host]
+
+
+def get(url: str, params: dict | None = None, timeout=DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    공용 풀을 통한 GET 요청 (재시도 후에도 실패한 응답은 그대로 반환)
+    """
+    session, semaphore = get_host_session(urlparse(url).netloc)
+    with semaphore:
+        return session.get(url, params=params, timeout=timeout, **kwargs)
+
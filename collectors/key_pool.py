@@ -0,0 +1,262 @@
+# collectors/key_pool.py
+
+"""
+API 키 풀 스케줄러
+- 키별 분당(token bucket) / 일일 사용량을 추적하여 여유가 가장 많은 키를 반환
+- 429 등으로 제한된 키는 제한 시간이 풀릴 때까지 제외(bench)
+- 빈 문자열 키는 무시
+- 일일 사용량과 bench 상태는 파일에 저장하여 프로세스 재시작 후에도 유지
+- 여러 프로세스(실시간 루프, 배치 프로세스)가 같은 파일을 쓰므로 파일 잠금(flock) 안에서
+  이 프로세스가 마지막 저장 이후 사용한 양을 파일 값에 더하고 (bench 시각은 max), 바뀐 풀만 저장
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from collectors.rate_limit import TokenBucket
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+KEY_STATE_PATH = os.getenv("API_KEY_STATE_PATH", "./.state/api_key_usage.json")
+SAVE_INTERVAL_SEC = 2.0
+
+_file_lock = threading.Lock()
+
+
+class ApiQuotaExhaustedError(Exception):
+    def __init__(self, pool_name: str):
+        super().__init__(f"{pool_name} API 키의 일일 한도가 모두 소진되었습니다.")
+        self.pool_name = pool_name
+
+
+def get_utc_day() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+def key_id(key: str) -> str:
+    """
+    상태 파일에 원본 키를 남기지 않도록 해시 앞부분만 사용
+    """
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+class ApiKeyPool:
+    def __init__(self, name: str, keys: list[str], per_minute: int | None = None, per_day: int | None = None,
+                 state_path: str | None = KEY_STATE_PATH):
+        self.name = name
+        self.keys = [k.strip() for k in keys if k.strip()]
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.state_path = state_path
+
+        self.buckets = {
+            key: TokenBucket(per_minute, per_minute / 60.0) for key in self.keys
+        } if per_minute else {}
+        self.day = get_utc_day()
+        self.daily_used = {key: 0 for key in self.keys}
+        self.unsaved_used = {key: 0 for key in self.keys}  # 마지막 저장 이후 이 프로세스의 사용량
+        self.benched_until = {key: 0.0 for key in self.keys}  # time.time() 기준
+
+        self.lock = threading.Lock()
+        self.last_saved_at = 0.0
+        self.dirty = False  # 마지막 저장 이후 이 프로세스에서 사용량/bench가 바뀌었는지
+        self.load_state()
+        atexit.register(self.save_state)
+
+    # ---------- 상태 저장 ----------
+
+    def load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f).get(self.name, {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {self.name} 키 사용량 파일 로딩 실패: {e}")
+            return
+
+        keys_state = state.get("keys", {})
+        same_day = state.get("day") == self.day
+        for key in self.keys:
+            entry = keys_state.get(key_id(key), {})
+            if same_day:
+                self.daily_used[key] = entry.get("used", 0)
+            self.benched_until[key] = entry.get("benched_until", 0.0)
+
+    def save_state(self, force: bool = True) -> None:
+        """
+        파일의 같은 풀 상태와 병합하여 저장 (사용량은 파일 값 + 미저장 사용량, bench 시각은 키별 max)
+        - 이 프로세스에서 바뀐 것이 없으면 저장하지 않음 (다른 프로세스의 최신 값을 덮어쓰지 않도록)
+        - 병합 결과는 메모리에도 반영하여 다른 프로세스의 사용량을 키 배분에 반영
+        """
+        if not self.state_path or not self.dirty:
+            return
+        now = time.time()
+        if not force and now - self.last_saved_at < SAVE_INTERVAL_SEC:
+            return
+        self.last_saved_at = now
+
+        with _file_lock:
+            try:
+                os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+                with open(f"{self.state_path}.lock", "w") as lock_file:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    self._merge_and_write()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ {self.name} 키 사용량 파일 저장 실패: {e}")
+
+    def _merge_and_write(self) -> None:
+        state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        saved = state.get(self.name, {})
+        saved_keys = saved.get("keys", {})
+
+        with self.lock:
+            self._roll_day()
+            saved_day = saved.get("day", "")
+            if saved_day > self.day:
+                return  # 다른 프로세스가 이미 다음 날(UTC)로 넘어감 → 이전 날 사용량으로 덮어쓰지 않음
+
+            day = self.day
+            flushed = dict(self.unsaved_used)
+            keys_state = {}
+            for key in self.keys:
+                entry = saved_keys.get(key_id(key), {})
+                used = flushed[key] + (entry.get("used", 0) if saved_day == day else 0)
+                # report_exhausted로 한도까지 올린 값은 유지 (로컬 값은 실제 사용량을 넘지 않음)
+                used = max(used, self.daily_used[key])
+                benched_until = max(self.benched_until[key], entry.get("benched_until", 0.0))
+                keys_state[key_id(key)] = {"used": used, "benched_until": benched_until}
+
+            if saved_day == day:
+                keys_state = {**saved_keys, **keys_state}  # 이 풀에 없는 키(다른 프로세스 설정)는 유지
+            state[self.name] = {"day": day, "keys": keys_state}
+
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+        # 저장에 성공한 사용량만 미저장분에서 빼고, 다른 프로세스 사용량이 더해진 값을 메모리에 반영
+        with self.lock:
+            if self.day != day:
+                return
+            self.dirty = any(self.unsaved_used[key] != flushed[key] for key in self.keys)
+            for key in self.keys:
+                self.unsaved_used[key] -= flushed[key]
+                entry = keys_state[key_id(key)]
+                self.daily_used[key] = max(self.daily_used[key], entry["used"] + self.unsaved_used[key])
+                self.benched_until[key] = max(self.benched_until[key], entry["benched_until"])
+
+    # ---------- 키 배분 ----------
+
+    def _roll_day(self) -> None:
+        today = get_utc_day()
+        if today != self.day:
+            self.day = today
+            self.daily_used = {key: 0 for key in self.keys}
+            self.unsaved_used = {key: 0 for key in self.keys}
+
+    def _daily_remaining(self, key: str) -> float:
+        if self.per_day is None:
+            return float("inf")
+        return self.per_day - self.daily_used[key]
+
+    def _minute_remaining(self, key: str) -> float:
+        if key not in self.buckets:
+            return float("inf")
+        bucket = self.buckets[key]
+        with bucket.lock:
+            bucket._refill()
+            return bucket.tokens
+
+    def acquire(self, cost: int = 1) -> str:
+        """
+        분당/일일 여유가 가장 많은 키를 골라 cost만큼 사용 처리 후 반환
+        - 분당 한도로 모든 키가 막혀 있으면 대기
+        - 사용 가능한 키가 없으면 (전부 일일 한도 소진) ApiQuotaExhaustedError
+        """
+        if not self.keys:
+            raise ApiQuotaExhaustedError(self.name)
+        if self.per_minute:
+            cost = min(cost, self.per_minute)
+
+        while True:
+            with self.lock:
+                self._roll_day()
+                now = time.time()
+                candidates = [
+                    key for key in self.keys
+                    if self.benched_until[key] <= now and self._daily_remaining(key) >= cost
+                ]
+                if not candidates and all(self._daily_remaining(key) < cost for key in self.keys):
+                    raise ApiQuotaExhaustedError(self.name)
+
+                candidates.sort(key=lambda k: (self._minute_remaining(k), self._daily_remaining(k)), reverse=True)
+
+                waits = [b - now for b in self.benched_until.values() if b > now]
+                for key in candidates:
+                    wait = self.buckets[key].try_acquire(cost) if key in self.buckets else 0.0
+                    if wait <= 0:
+                        self.daily_used[key] += cost
+                        self.unsaved_used[key] += cost
+                        self.dirty = True
+                        break
+                    waits.append(wait)
+                else:
+                    key = None
+
+            if key is not None:
+                self.save_state(force=False)
+                return key
+
+            time.sleep(max(0.05, min(waits)))
+
+    def report_rate_limited(self, key: str, retry_after: float | None = None) -> None:
+        """
+        429 응답을 받은 키를 retry_after초(기본 60초) 동안 제외
+        """
+        if key not in self.benched_until:
+            return
+        with self.lock:
+            self.benched_until[key] = time.time() + (retry_after or 60.0)
+            self.dirty = True
+        print(f"⏸️ {self.name} 키({key_id(key)}) 요청 제한 → {retry_after or 60.0:.0f}초 제외")
+        self.save_state()
+
+    def report_exhausted(self, key: str) -> None:
+        """
+        일일 한도가 소진된 키를 UTC 자정까지 제외
+        """
+        if key not in self.benched_until:
+            return
+        with self.lock:
+            if self.per_day is not None:
+                self.daily_used[key] = max(self.daily_used[key], self.per_day)
+            self.benched_until[key] = time.time() + seconds_until_utc_midnight()
+            self.dirty = True
+        print(f"⛔ {self.name} 키({key_id(key)}) 일일 한도 소진 → UTC 자정까지 제외")
+        self.save_state()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
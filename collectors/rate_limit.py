@@ -0,0 +1,43 @@
+# collectors/rate_limit.py
+
+"""
+호출 속도 제한용 token bucket
+- 분당 한도만큼 토큰을 채워두고, 요청 시 토큰을 소모
+- 여러 스레드에서 동시에 사용 가능 (키별 배분은 collectors/key_pool.py)
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_sec)
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        토큰을 소모하고 0을 반환. 부족하면 소모하지 않고 필요한 대기 시간(초)을 반환
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.refill_per_sec
+
+    def acquire(self, tokens: float = 1) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
@@ -1,28 +1,94 @@
 import os
-import requests
+from collectors import http
 from dotenv import load_dotenv
-from typing import List, Dict
-from itertools import cycle
+from typing import List, Dict, Tuple
 from time import sleep
+from collectors.key_pool import ApiKeyPool, parse_retry_after
+from models.bar_batch import BarBatch
+import numpy as np
 
 load_dotenv()
 
 TWELVE_API_KEYS = os.getenv("TWELVE_API_KEYS", "").split(",")
 TWELVE_API_URL = "https://api.twelvedata.com/time_series"
-api_key_cycle = cycle(TWELVE_API_KEYS)
+
+# 키별 분당/일일 크레딧 한도 (Basic 플랜 기준 8 / 800)
+TWELVE_CREDITS_PER_MIN = int(os.getenv("TWELVE_API_CREDITS_PER_MIN", 8))
+TWELVE_CREDITS_PER_DAY = int(os.getenv("TWELVE_API_CREDITS_PER_DAY", 800))
+key_pool = ApiKeyPool("twelvedata", TWELVE_API_KEYS, per_minute=TWELVE_CREDITS_PER_MIN, per_day=TWELVE_CREDITS_PER_DAY)
+
+DAILY_INTERVALS = ("1day", "1week", "1month")
+
+# time_series 배치 요청 1회당 최대 심볼 수 (심볼당 1크레딧 소모)
+TWELVE_MAX_BATCH_SIZE = 120
 
 
 def get_next_api_key():
-    return next(api_key_cycle)
+    return key_pool.acquire()
+
+
+def acquire_api_key(credits: int = 1) -> str:
+    """
+    분당/일일 크레딧 여유가 가장 많은 키를 확보하여 반환 (모든 키가 분당 한도에 걸리면 대기)
+    """
+    return key_pool.acquire(credits)
+
+
+def report_http_rate_limited(api_key: str, response) -> None:
+    """
+    HTTP 429 응답이면 해당 키를 Retry-After(기본 60초) 동안 제외 (http 모듈은 이 호스트의 429를 재시도하지 않음)
+    """
+    if response.status_code == 429:
+        key_pool.report_rate_limited(api_key, parse_retry_after(response.headers.get("Retry-After")))
+
+
+def report_api_error(api_key: str, json_data: dict) -> None:
+    """
+    크레딧 초과 응답(code 429)이면 해당 키를 분 단위 또는 UTC 자정까지 제외
+    """
+    if json_data.get("code") != 429:
+        return
+    if "day" in json_data.get("message", ""):
+        key_pool.report_exhausted(api_key)
+    else:
+        key_pool.report_rate_limited(api_key)
+
+
+def get_batch_size() -> int:
+    """
+    한 번의 배치 요청에 담을 심볼 수 (키 하나의 분당 크레딧을 넘지 않도록 제한)
+    """
+    return max(1, min(TWELVE_MAX_BATCH_SIZE, TWELVE_CREDITS_PER_MIN))
+
+
+def parse_time_series(symbol: str, interval: str, json_data: dict) -> BarBatch:
+    """
+    time_series 응답(단일 심볼 분량)을 BarBatch로 변환
+    - 일/주/월봉은 날짜, 분봉은 초 단위 timestamp
+    """
+    values = json_data["values"]
+    unit = "D" if interval in DAILY_INTERVALS else "s"
+    return BarBatch(
+        symbol,
+        interval,
+        np.array([item.get("datetime") for item in values], dtype=f"datetime64[{unit}]"),
+        [float(item.get("open", 0)) for item in values],
+        [float(item.get("high", 0)) for item in values],
+        [float(item.get("low", 0)) for item in values],
+        [float(item.get("close", 0)) for item in values],
+        [float(item.get("volume", 0)) for item in values],
+    )
 
 
-def get_ohlcv_from_twelvedata(symbol: str, interval: str, limit: int = 100) -> List[Dict]:
+def get_ohlcv_from_twelvedata(symbol: str, interval: str, limit: int = 100, api_key: str | None = None) -> BarBatch | None:
     """
     지정된 interval로 해당 symbol의 OHLCV 데이터를 수집.
     interval: '1day', '1week', '1month', '15min', '60min'
+    api_key: 호출 측에서 rate limiter로 확보한 키 (없으면 순환 키 사용)
     """
-    results = []
-    api_key = get_next_api_key()
+    results = None
+    if api_key is None:
+        api_key = get_next_api_key()
     params = {
         "symbol": symbol,
         "interval": interval,
@@ -33,27 +99,67 @@ def get_ohlcv_from_twelvedata(symbol: str, interval: str, limit: int = 100) -> L
     }
 
     try:
-        response = requests.get(TWELVE_API_URL, params=params, timeout=10)
+        response = http.get(TWELVE_API_URL, params=params)
+        report_http_rate_limited(api_key, response)
         response.raise_for_status()
         json_data = response.json()
 
         if "values" not in json_data:
             print(f"❌ {symbol} ({interval}) 수집 실패: {json_data.get('message', '알 수 없는 오류')}")
-            return []
-
-        for item in json_data["values"]:
-            results.append({
-                "symbol": symbol,
-                "interval": interval,
-                "timestamp": item.get("datetime"),  # ISO 문자열
-                "open": float(item.get("open", 0)),
-                "high": float(item.get("high", 0)),
-                "low": float(item.get("low", 0)),
-                "close": float(item.get("close", 0)),
-                "volume": float(item.get("volume", 0)),
-            })
+            report_api_error(api_key, json_data)
+            return None
+
+        results = parse_time_series(symbol, interval, json_data)
 
     except Exception as e:
         print(f"⚠️ {symbol} ({interval}) 수집 중 예외 발생: {e}")
 
     return results
+
+
+def fetch_time_series_batch(symbols: List[str], interval: str, limit: int, api_key: str) -> Tuple[Dict[str, BarBatch], Dict[str, str]]:
+    """
+    여러 심볼을 콤마로 묶어 time_series 한 번으로 요청 (symbols는 배치 크기 이하여야 함)
+    - 응답은 {심볼: 단일 응답} 형태의 map (심볼이 1개면 단일 응답 그대로)
+    Returns: ({symbol: BarBatch}, {symbol: 실패 사유})
+    """
+    params = {
+        "symbol": ",".join(symbols),
+        "interval": interval,
+        "outputsize": limit,
+        "apikey": api_key,
+        "format": "JSON",
+        "order": "desc"
+    }
+
+    try:
+        response = http.get(TWELVE_API_URL, params=params)
+        report_http_rate_limited(api_key, response)
+        response.raise_for_status()
+        json_data = response.json()
+    except Exception as e:
+        return {}, {symbol: f"요청 예외: {e}" for symbol in symbols}
+
+    # 요청 전체가 거부된 경우 (키 한도 초과 등)
+    if json_data.get("status") == "error":
+        report_api_error(api_key, json_data)
+        message = json_data.get("message", "알 수 없는 오류")
+        return {}, {symbol: message for symbol in symbols}
+
+    if len(symbols) == 1:
+        json_data = {symbols[0]: json_data}
+
+    results, failures = {}, {}
+    for symbol in symbols:
+        entry = json_data.get(symbol)
+        if not entry:
+            failures[symbol] = "응답 누락"
+        elif "values" not in entry:
+            failures[symbol] = entry.get("message", "알 수 없는 오류")
+        else:
+            try:
+                results[symbol] = parse_time_series(symbol, interval, entry)
+            except (TypeError, ValueError) as e:
+                failures[symbol] = f"파싱 실패: {e}"
+
+    return results, failures
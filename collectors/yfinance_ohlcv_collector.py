@@ -1,64 +1,140 @@
-import yfinance as yf
 from typing import List, Dict
-import math
+import numpy as np
+from models.bar_batch import BarBatch
+
+# yfinance/pandas는 무거우므로 실제 수집 시점에 import
+
+YF_INTERVAL_MAP = {
+    "1day": "1d",
+    "1week": "1wk",
+    "1month": "1mo"
+}
+
 
 def convert_yahoo_symbol(symbol: str) -> str:
     return symbol.replace('.', '-')
 
-def get_ohlcv_from_yfinance(symbol: str, interval: str, limit: int = 100) -> List[Dict]:
-    yf_interval_map = {
-        "1day": "1d",
-        "1week": "1wk",
-        "1month": "1mo"
-    }
 
+def get_yf_period(interval: str, limit: int) -> str:
     yf_period_map = {
         "1day": f"{limit}d",
         "1week": f"{limit * 7}d",
         "1month": f"{limit}mo"
     }
+    return yf_period_map[interval]
 
-    if interval not in yf_interval_map:
+
+def get_ohlcv_from_yfinance(symbol: str, interval: str, limit: int = 100) -> BarBatch | None:
+    if interval not in YF_INTERVAL_MAP:
         print(f"❌ {symbol} ({interval}) 수집 실패: yfinance는 '{interval}'를 지원하지 않음")
-        return []
+        return None
+
+    yf_interval = YF_INTERVAL_MAP[interval]
+    yf_period = get_yf_period(interval, limit)
 
-    yf_interval = yf_interval_map[interval]
-    yf_period = yf_period_map[interval]
-    
     yahoo_symbol = convert_yahoo_symbol(symbol)
 
+    import yfinance as yf
+
     try:
         ticker = yf.Ticker(yahoo_symbol)
         hist = ticker.history(period=yf_period, interval=yf_interval)
 
         if hist.empty:
             print(f"❌ {symbol} ({interval}) 수집 실패: 결과 없음")
-            return []
-
-        results = []
-        for dt, row in hist.iterrows():
-            values = [row["Open"], row["High"], row["Low"], row["Close"]]
-            if any(math.isnan(v) for v in values):
-                print(
-                    f"⚠️ {symbol} {dt.strftime('%Y-%m-%d')} 수집 누락: NaN 포함 → "
-                    f"open={row['Open']}, high={row['High']}, low={row['Low']}, close={row['Close']}"
-                )
-                print(f"↳ 원본 row: {row.to_dict()}")
-                continue
-
-            results.append({
-                "symbol": symbol,
-                "interval": interval,
-                "timestamp": dt.strftime("%Y-%m-%d"),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": float(row["Volume"]),
-            })
-
-        return results[::-1]
+            return None
+
+        return frame_to_batch(hist, symbol, interval)
 
     except Exception as e:
         print(f"⚠️ {symbol} ({interval}) yfinance 수집 예외: {e}")
-        return []
+        return None
+
+
+def frame_to_batch(hist, symbol: str, interval: str) -> BarBatch | None:
+    """
+    yfinance history DataFrame(Open/High/Low/Close/Volume)을 BarBatch(날짜 오름차순)로 변환
+    - OHLC 중 NaN이 있는 행은 mask로 한 번에 제외하고 개수만 출력
+    - 날짜 포맷/float 변환은 컬럼 단위로 처리
+    """
+    ohlc = hist[["Open", "High", "Low", "Close"]]
+    valid = ohlc.notna().all(axis=1).to_numpy()
+    dropped = len(valid) - int(valid.sum())
+    if dropped:
+        print(f"⚠️ {symbol} ({interval}) NaN 포함 {dropped}개 행 수집 누락")
+
+    hist = hist[valid]
+    if hist.empty:
+        return None
+
+    return BarBatch(
+        symbol,
+        interval,
+        np.array(hist.index.strftime("%Y-%m-%d"), dtype="datetime64[D]"),
+        hist["Open"].to_numpy(dtype=float),
+        hist["High"].to_numpy(dtype=float),
+        hist["Low"].to_numpy(dtype=float),
+        hist["Close"].to_numpy(dtype=float),
+        hist["Volume"].fillna(0).to_numpy(dtype=float),
+    )
+
+
+def split_download_frame(frame, symbol: str, yahoo_symbol: str, interval: str) -> BarBatch | None:
+    """
+    yf.download(group_by="ticker")가 반환한 wide DataFrame에서 한 종목의 OHLCV만 잘라 BarBatch로 변환
+    - 종목별 컬럼이 없거나 모두 NaN이면 None
+    """
+    import pandas as pd
+
+    if isinstance(frame.columns, pd.MultiIndex):
+        if yahoo_symbol not in frame.columns.get_level_values(0):
+            return None
+        hist = frame[yahoo_symbol]
+    else:
+        hist = frame  # 단일 종목 요청 시 컬럼이 평탄화된 경우
+
+    # 배치 요청에서는 다른 종목의 거래일 때문에 해당 종목 값이 모두 NaN인 행이 생기므로 먼저 제거
+    hist = hist.dropna(how="all")
+    return frame_to_batch(hist, symbol, interval)
+
+
+def get_ohlcv_batch_from_yfinance(symbols: List[str], interval: str, limit: int = 100) -> Dict[str, BarBatch | None]:
+    """
+    여러 종목의 OHLCV를 한 번의 yf.download 요청으로 수집하여 종목별 BarBatch로 분리
+    - 모든 종목이 같은 limit(조회 기간)을 공유해야 하므로 호출 측에서 lookback 기준으로 묶어서 호출
+    Returns: {"AAPL": BarBatch, "MSFT": BarBatch, ...} (수집 실패 종목은 None)
+    """
+    if interval not in YF_INTERVAL_MAP:
+        print(f"❌ ({interval}) 배치 수집 실패: yfinance는 '{interval}'를 지원하지 않음")
+        return {symbol: None for symbol in symbols}
+
+    yahoo_map = {symbol: convert_yahoo_symbol(symbol) for symbol in symbols}
+
+    import yfinance as yf
+
+    try:
+        frame = yf.download(
+            tickers=list(yahoo_map.values()),
+            period=get_yf_period(interval, limit),
+            interval=YF_INTERVAL_MAP[interval],
+            group_by="ticker",
+            threads=True,
+            progress=False,
+        )
+    except Exception as e:
+        print(f"⚠️ {len(symbols)}개 종목 ({interval}) yfinance 배치 수집 예외: {e}")
+        return {symbol: None for symbol in symbols}
+
+    if frame is None or frame.empty:
+        print(f"❌ {len(symbols)}개 종목 ({interval}) 배치 수집 실패: 결과 없음")
+        return {symbol: None for symbol in symbols}
+
+    results = {}
+    for symbol, yahoo_symbol in yahoo_map.items():
+        try:
+            results[symbol] = split_download_frame(frame, symbol, yahoo_symbol, interval)
+        except Exception as e:
+            print(f"⚠️ {symbol} ({interval}) 배치 결과 분리 중 예외: {e}")
+            results[symbol] = None
+
+    return results
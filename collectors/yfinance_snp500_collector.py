@@ -1,17 +1,15 @@
-import yfinance as yf
 from datetime import date, timedelta
 from utils.dates import get_last_business_day_of_month
-import pandas as pd
 
 def calc_change(current, past):
     if current is None or past is None:
         return None
     return round((current - past) / past * 100, 2)
 
-def get_closest_price(hist: pd.Series, target: date) -> float:
+def get_closest_price(hist, target: date) -> float:
     """
     주어진 날짜 기준 ±7일 이내의 가장 가까운 종가를 반환.
-    hist.index는 datetime.date 형식이어야 함.
+    hist: pandas Series (index는 datetime.date 형식이어야 함)
     """
     for offset in range(7):
         for delta in [offset, -offset]:
@@ -23,7 +21,7 @@ def get_closest_price(hist: pd.Series, target: date) -> float:
 
 
 def fetch_snp500_multi_returns(base_date: date, max_months: int = 12) -> list[dict]:
-    from utils.dates import get_last_business_day_of_month
+    import yfinance as yf  # 무거운 모듈이므로 수집 시점에 import
 
     start_date = (base_date.replace(day=1) - timedelta(days=32 * max_months)).replace(day=1)
     ticker = yf.Ticker("^GSPC")
@@ -1,4 +1,3 @@
-import yfinance as yf
 from typing import List, Dict
 from time import sleep
 
@@ -20,6 +19,8 @@ def fetch_stock_profiles_yf(symbols: List[str], sleep_sec: float = 0.3) -> List[
             ...
         ]
     """
+    import yfinance as yf  # 무거운 모듈이므로 수집 시점에 import
+
     results = []
 
     for idx, symbol in enumerate(symbols):
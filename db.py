@@ -1,7 +1,8 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
-import pymysql
+import threading
 import os
 import time
 
@@ -15,34 +16,71 @@ DB_USERNAME = os.getenv('DB_USERNAME')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_DATABASE = os.getenv('DB_DATABASE')
 
+# 커넥션 풀 설정 (매시간 실행 사이의 긴 유휴 시간 동안 끊긴 연결은 pre_ping/recycle로 교체)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+
 # SQLAlchemy 연결 문자열 구성
 DATABASE_URL = (
     f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}"
     f"@{DB_HOST}:{DB_PORT}/{DB_DATABASE}?charset=utf8mb4"
 )
 
-# DB 연결 재시도 로직
-for i in range(10):
-    try:
-        print(f"🔌 DB 연결 시도 중... ({i+1}/10)")
-        test_conn = pymysql.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USERNAME,
-            password=DB_PASSWORD,
-            database=DB_DATABASE,
-            connect_timeout=3
-        )
-        test_conn.close()
-        print("✅ DB 연결 성공")
-        break
-    except pymysql.err.OperationalError as e:
-        print(f"⏳ 연결 실패: {e}")
-        time.sleep(3)
-else:
-    print("❌ DB 연결 10회 실패. 종료합니다.")
-    exit(1)
-
-# SQLAlchemy 엔진 및 세션 팩토리 생성
-engine = create_engine(DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def wait_for_db(max_attempts: int = 10, delay_sec: float = 3) -> None:
+    """
+    DB 연결 재시도 로직 (엔진 최초 생성 시 1회 실행)
+    """
+    import pymysql
+
+    for i in range(max_attempts):
+        try:
+            print(f"🔌 DB 연결 시도 중... ({i+1}/{max_attempts})")
+            test_conn = pymysql.connect(
+                host=DB_HOST,
+                port=DB_PORT,
+                user=DB_USERNAME,
+                password=DB_PASSWORD,
+                database=DB_DATABASE,
+                connect_timeout=3
+            )
+            test_conn.close()
+            print("✅ DB 연결 성공")
+            return
+        except pymysql.err.OperationalError as e:
+            print(f"⏳ 연결 실패: {e}")
+            time.sleep(delay_sec)
+
+    raise RuntimeError(f"❌ DB 연결 {max_attempts}회 실패")
+
+
+def get_engine() -> Engine:
+    """
+    SQLAlchemy 엔진을 최초 사용 시점에 생성하여 반환
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                wait_for_db()
+                _engine = create_engine(
+                    DATABASE_URL,
+                    echo=False,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_pre_ping=True,
+                    pool_recycle=DB_POOL_RECYCLE,
+                )
+    return _engine
+
+
+# 세션 팩토리 (bind는 세션 생성 시점에 지정)
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
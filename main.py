@@ -1,86 +1,110 @@
 from db import SessionLocal
 from services.ohlcv_realtime_service import collect_ohlcv_intraday
-from batch import run_batch_job
-from datetime import datetime, date, time as dtime, timezone, timedelta
+from batch_supervisor import BatchSupervisor
+from utils import market_calendar
+from utils.dates import next_session, previous_session
+from datetime import datetime, date, timezone, timedelta
+import os
 import time
 import traceback
 import signal
 import sys
 
-def get_us_market_status() -> str:
-    """
-    미국 주식 시장 상태 반환 (UTC 기준)
-    Returns: 'pre', 'regular', 'after', or 'closed'
-    """
-    now = datetime.now(timezone.utc).time()
-    if dtime(9, 0) <= now < dtime(14, 30):
-        return "pre"
-    elif dtime(14, 30) <= now < dtime(21, 0):
-        return "regular"
-    elif dtime(21, 0) <= now or now < dtime(1, 0):
-        return "after"
-    else:
-        return "closed"
-
 def load_symbols_from_txt(path: str) -> list[str]:
     with open(path, "r", encoding="utf-8") as f:
         return [s.strip() for s in f.read().split(",") if s.strip()]
 
+# 배치는 별도 프로세스에서 실행 (실시간 수집 루프가 막히지 않도록)
+# spawn된 배치 프로세스가 이 모듈을 다시 import하므로 생성/시그널 등록은 main_loop에서 함
+batch_supervisor: BatchSupervisor | None = None
+
 def graceful_shutdown(signum, frame):
     print(f"\n🛑 종료 시그널({signum}) 감지됨. 안전하게 종료합니다.")
+    if batch_supervisor:
+        batch_supervisor.stop()
     sys.exit(0)
 
-signal.signal(signal.SIGINT, graceful_shutdown)
-signal.signal(signal.SIGTERM, graceful_shutdown)
+BAR_MINUTES = 60  # 수집하는 분봉 간격 ("1h")
+# bar가 끝난 뒤 API에 반영될 때까지 기다리는 시간
+BAR_READY_DELAY_SEC = int(os.getenv("BAR_READY_DELAY_SEC", 5))
+# 폐장 후 배치를 시작하기까지의 대기 시간
+BATCH_DELAY_MINUTES = int(os.getenv("BATCH_DELAY_MINUTES", 60))
+# 시스템 시계 변경/절전 복귀에 대비해 한 번에 최대 이만큼만 잠들고 다시 계산
+MAX_SLEEP_SEC = 900
+# 배치 프로세스가 실행 중일 때 종료 여부를 확인하는 간격
+BATCH_POLL_SEC = 60
+
+def run_intraday(symbols: list[str], intervals: list[str], bar_close: datetime):
+    session = None
+    try:
+        session = SessionLocal()  # 엔진은 최초 사용 시점에 생성됨
+        collect_ohlcv_intraday(session, symbols, intervals, bar_close=bar_close)
+        print("✅ 실시간 수집 완료")
+    except Exception as e:
+        print(f"❌ 실시간 수집 오류: {e}")
+        traceback.print_exc()
+        if session:
+            session.rollback()
+    finally:
+        if session:
+            session.close()
+
+def get_pending_batch_day(now: datetime, last_batch_day: date | None) -> date:
+    """
+    아직 배치를 돌리지 않은 가장 최근 거래일 (이미 돌렸으면 다음 거래일)
+    """
+    day = previous_session(market_calendar.get_market_date(now), inclusive=True)
+    if day == last_batch_day:
+        day = next_session(day)
+    return day
+
+def main_loop(intervals: list[str] = ["1h"]):
+    """
+    NYSE 캘린더 기반 스케줄러
+    - 정규장 1시간 봉이 끝나는 시각(개장 09:30 기준, 조기 폐장 반영) 직후에 실시간 수집
+    - 거래일 폐장 + BATCH_DELAY_MINUTES 이후 배치 1회 실행 (별도 프로세스, 이전 배치가 실행 중이면 거부)
+    - 휴장일/주말에는 다음 이벤트까지 잠듦
+    """
+    global batch_supervisor
+    batch_supervisor = BatchSupervisor("./static/symbols.txt")
+    signal.signal(signal.SIGINT, graceful_shutdown)
+    signal.signal(signal.SIGTERM, graceful_shutdown)
 
-def main_loop(interval_sec: int = 3600):  # 1시간 간격 루프
     symbols = load_symbols_from_txt("./static/symbols.txt")
-    last_batch_date: date | None = None
-    batch_eligible_time: datetime | None = None
+    last_batch_day: date | None = None
+
+    now = datetime.now(timezone.utc)
+    next_bar = market_calendar.next_bar_close(now, BAR_MINUTES)
 
     while True:
+        batch_supervisor.poll()
         now = datetime.now(timezone.utc)
-        now_date = now.date()
-        intervals = ["1h"]
+        bar_ready_at = next_bar + timedelta(seconds=BAR_READY_DELAY_SEC)
 
-        status = get_us_market_status()
+        if now >= bar_ready_at:
+            print(f"🟢 [{now}] {next_bar.astimezone(market_calendar.MARKET_TZ):%Y-%m-%d %H:%M} ET 봉 마감 → 실시간 수집")
+            run_intraday(symbols, intervals, next_bar)
+            next_bar = market_calendar.next_bar_close(max(now, bar_ready_at), BAR_MINUTES)
+            continue
 
-        # if status in ("regular", "after"):
-        if status in ("regular"):
-            print(f"🟢 [{now}] 시장 상태: {status} → 실시간 수집")
-            session = SessionLocal()
+        batch_day = get_pending_batch_day(now, last_batch_day)
+        batch_at = market_calendar.get_batch_time(batch_day, BATCH_DELAY_MINUTES)
+
+        if now >= batch_at:
             try:
-                collect_ohlcv_intraday(session, symbols, intervals)
-                # print("실시간 수집 임시 종료 상태!")
-                print("✅ 실시간 수집 완료")
+                batch_supervisor.start(batch_day)
             except Exception as e:
-                print(f"❌ 실시간 수집 오류: {e}")
+                print(f"❌ 배치 프로세스 시작 오류: {e}")
                 traceback.print_exc()
-                session.rollback()
-            finally:
-                session.close()
-            batch_eligible_time = None  # 수집했으니 초기화
-
-        else:
-            print(f"🔕 [{now}] 시장 상태: {status} → 배치 실행 조건 확인")
-
-            # 오프타임 진입 시점 기록
-            if batch_eligible_time is None:
-                batch_eligible_time = now + timedelta(hours=1)
-                print(f"⏳ 오프타임 감지 → 배치 가능 시간 예약: {batch_eligible_time}")
-
-            # 1시간 지났고 오늘 실행 안 했으면 실행
-            if now >= batch_eligible_time and last_batch_date != now_date:
-                try:
-                    print("🌙 배치 실행 시작")
-                    run_batch_job()
-                    last_batch_date = now_date
-                except Exception as e:
-                    print(f"❌ 배치 실행 중 오류: {e}")
-                    traceback.print_exc()
+            last_batch_day = batch_day  # 실패하거나 거부돼도 같은 날 반복 실행하지 않음
+            continue
 
-        time.sleep(interval_sec)
+        wake_at = min(bar_ready_at, batch_at)
+        max_sleep = BATCH_POLL_SEC if batch_supervisor.is_running() else MAX_SLEEP_SEC
+        sleep_sec = min((wake_at - now).total_seconds(), max_sleep)
+        print(f"💤 [{now}] 시장 상태: {market_calendar.get_market_status(now)} → {wake_at.astimezone(timezone.utc)}까지 대기")
+        time.sleep(max(sleep_sec, 1))
 
 if __name__ == "__main__":
-    print("🚀 실시간 + 배치 통합 수집 루프 시작 (1시간 간격)")
+    print("🚀 실시간 + 배치 통합 수집 루프 시작 (NYSE 캘린더 기준)")
     main_loop()
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class BarBatch:
+    """
+    한 종목·한 interval의 OHLCV 묶음을 컬럼 배열로 보관
+    - symbol/interval은 묶음당 한 번만 저장
+    - timestamps: datetime64[D] (일/주/월봉) 또는 datetime64[s] (분봉)
+    - open/high/low/close/volume: float64 배열
+    - 수집~저장 대기 구간에서만 컬럼 배열로 유지됨. DB insert 시점에는 insert_ohlcv_bulk 등이
+      bar마다 row dict를 만들고 bulk_upsert가 한 번 더 복사하므로, 그 순간의 메모리는
+      UpsertPipeline의 flush_rows(한 번에 저장하는 bar 수)만큼의 dict에 비례
+    """
+
+    __slots__ = ("symbol", "interval", "timestamps", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol: str, interval: str, timestamps, open, high, low, close, volume):
+        self.symbol = symbol
+        self.interval = interval
+        self.timestamps = np.asarray(timestamps)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __repr__(self) -> str:
+        return f"BarBatch({self.symbol}, {self.interval}, {len(self)} bars)"
+
+    @classmethod
+    def from_rows(cls, symbol: str, interval: str, rows: list[dict], unit: str = "D") -> "BarBatch":
+        """
+        {timestamp, open, high, low, close, volume} dict 리스트에서 생성
+        unit: timestamp 해상도 ('D' = 날짜, 's' = 초)
+        """
+        return cls(
+            symbol,
+            interval,
+            np.array([row["timestamp"] for row in rows], dtype=f"datetime64[{unit}]"),
+            [row["open"] for row in rows],
+            [row["high"] for row in rows],
+            [row["low"] for row in rows],
+            [row["close"] for row in rows],
+            [row["volume"] for row in rows],
+        )
+
+    def slice(self, start: int, stop: int) -> "BarBatch":
+        """
+        [start:stop] 구간의 view (배열 복사 없음)
+        """
+        return BarBatch(
+            self.symbol, self.interval, self.timestamps[start:stop],
+            self.open[start:stop], self.high[start:stop], self.low[start:stop],
+            self.close[start:stop], self.volume[start:stop],
+        )
+
+    def latest(self) -> "BarBatch":
+        """
+        가장 최신 bar 1개만 담은 묶음
+        """
+        i = int(np.argmax(self.timestamps))
+        return self.slice(i, i + 1)
+
+    def latest_before(self, boundary: np.datetime64) -> "BarBatch | None":
+        """
+        boundary 이전에 시작한 bar 중 가장 최신 1개 (없으면 None)
+        - bar는 시작 시각으로 라벨링되므로 boundary 이후 시작한 bar는 아직 만들어지는 중인 bar
+        """
+        completed = np.flatnonzero(self.timestamps < boundary)
+        if not len(completed):
+            return None
+        i = int(completed[np.argmax(self.timestamps[completed])])
+        return self.slice(i, i + 1)
+
+    def earliest_date(self):
+        return self.timestamps.min().astype("datetime64[D]").item()
+
+    def iter_values(self):
+        """
+        DB 저장용 (timestamp, open, high, low, close, volume) 튜플을 순서대로 생성
+        timestamp는 datetime.date 또는 datetime.datetime
+        """
+        return zip(
+            self.timestamps.tolist(),
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+            self.volume.tolist(),
+        )
+
+
+def count_bars(batches: list[BarBatch]) -> int:
+    return sum(len(batch) for batch in batches)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from models import Base
+
+class StockIndicator(Base):
+    __tablename__ = "stock_indicator"
+
+    id = Column(Integer, primary_key=True)
+    stock_id = Column(Integer, ForeignKey("stock.id", ondelete="CASCADE"), nullable=False)
+    timestamp = Column(Date, nullable=False)
+    interval = Column(String(10), nullable=False)  # '1day'
+    sma20 = Column(Float, nullable=True)
+    sma50 = Column(Float, nullable=True)
+    sma200 = Column(Float, nullable=True)
+    ema20 = Column(Float, nullable=True)
+    ema50 = Column(Float, nullable=True)
+    ema200 = Column(Float, nullable=True)
+    rsi14 = Column(Float, nullable=True)
+    atr14 = Column(Float, nullable=True)
+    bbUpper = Column(Float, nullable=True)  # 볼린저 밴드 (20일, 2σ) - 중심선은 sma20
+    bbLower = Column(Float, nullable=True)
+    volatility20 = Column(Float, nullable=True)  # 20일 로그수익률 표준편차 연율화 (%)
+    createdAt = Column(DateTime, default=func.now())
+    updatedAt = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("stock_id", "timestamp", "interval", name="UQ_STOCK_INDICATOR"),
+        Index("IDX_STOCK_INDICATOR", "stock_id", "timestamp", "interval"),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, Date, String, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from models import Base
+
+class StockReturn(Base):
+    __tablename__ = "stock_return"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20), nullable=False)  # 종목 + 지수('^GSPC' 등)라서 stock_id 대신 symbol
+    timestamp = Column(Date, nullable=False)  # 기준일 (이 날짜까지의 마지막 종가 기준)
+    return1W = Column(Float, nullable=True)  # 수익률 (%)
+    return1M = Column(Float, nullable=True)
+    return2M = Column(Float, nullable=True)
+    return3M = Column(Float, nullable=True)
+    return4M = Column(Float, nullable=True)
+    return5M = Column(Float, nullable=True)
+    return6M = Column(Float, nullable=True)
+    return7M = Column(Float, nullable=True)
+    return8M = Column(Float, nullable=True)
+    return9M = Column(Float, nullable=True)
+    return10M = Column(Float, nullable=True)
+    return11M = Column(Float, nullable=True)
+    return12M = Column(Float, nullable=True)
+    returnYTD = Column(Float, nullable=True)
+    createdAt = Column(DateTime, default=func.now())
+    updatedAt = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("symbol", "timestamp", name="UQ_STOCK_RETURN"),
+        Index("IDX_STOCK_RETURN_TIMESTAMP", "timestamp", "symbol"),
+    )
@@ -0,0 +1,54 @@
+# repos/bulk_upsert.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import datetime
+
+
+def bulk_upsert(session: Session, model, rows: list[dict], unique_keys: list[str],
+                update_columns: list[str] | None = None, chunk_size: int = 1000,
+                commit_per_chunk: bool = False, now: datetime | None = None) -> int:
+    """
+    여러 row를 chunk 단위의 multi-row INSERT ... ON DUPLICATE KEY UPDATE로 저장
+    - commit_per_chunk=False면 commit은 호출 측에서, True면 chunk마다 commit (대량 적재 시 트랜잭션 크기 제한)
+    - rows: 테이블 컬럼명 기준 dict 리스트
+    - unique_keys: 중복 판정 기준 컬럼 (같은 키가 여러 번 오면 마지막 값 사용)
+    - update_columns: 중복 시 갱신할 컬럼 (기본: 키와 createdAt을 제외한 전체)
+    - createdAt/updatedAt 컬럼이 있으면 now(기본: 현재 시각)로 채움
+    Returns: upsert한 row 수 (키 중복 제거 후)
+    - MySQL affected rows(신규 1, 갱신 2, 변경 없음 0)로는 같은 값으로 다시 upsert된 행 등을
+      구분할 수 없어 추가/갱신 건수는 따로 세지 않음
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    now = now or datetime.now()
+    has_created = "createdAt" in table.c
+    has_updated = "updatedAt" in table.c
+
+    # 같은 키는 마지막 값만 유지
+    deduped = {tuple(row[k] for k in unique_keys): row for row in rows}
+    values = []
+    for row in deduped.values():
+        row = dict(row)
+        if has_created:
+            row.setdefault("createdAt", now)
+        if has_updated:
+            row["updatedAt"] = now
+        values.append(row)
+
+    if update_columns is None:
+        update_columns = [c for c in values[0] if c not in unique_keys and c != "createdAt"]
+    elif has_updated and "updatedAt" not in update_columns:
+        update_columns = [*update_columns, "updatedAt"]
+
+    for i in range(0, len(values), chunk_size):
+        chunk = values[i:i + chunk_size]
+        stmt = mysql_insert(table).values(chunk)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+        session.execute(stmt)
+        if commit_per_chunk:
+            session.commit()
+
+    return len(values)
@@ -3,27 +3,67 @@
 from sqlalchemy.orm import Session
 from models.stock import Stock
 from models.stock_financials import StockFinancials
+from repos.stock_registry import get_stock_id, get_stock_ids
 from datetime import date
+from sqlalchemy import func
 
 
-def get_recent_financials(session: Session, symbol: str, within_months: int = 3) -> list[StockFinancials]:
+def get_threshold_date(within_months: int) -> date:
     """
-    특정 종목(symbol)에 대해 최근 N개월 이내 수집된 재무정보 조회
+    이번 달 1일 기준 N개월 전 1일 반환
     """
-    stock = session.query(Stock).filter(Stock.symbol == symbol).first()
-    if not stock:
-        return []
-
     threshold_date = date.today().replace(day=1)
     month = threshold_date.month - within_months
     year = threshold_date.year
     while month <= 0:
         month += 12
         year -= 1
-    threshold_date = threshold_date.replace(year=year, month=month)
+    return threshold_date.replace(year=year, month=month)
+
+
+def get_fresh_financial_symbols(session: Session, within_months: int = 3) -> set[str]:
+    """
+    최근 N개월 이내 재무정보가 있는 종목 심볼 집합을 한 번의 쿼리로 조회
+    """
+    rows = session.query(Stock.symbol).join(
+        StockFinancials, StockFinancials.stock_id == Stock.id
+    ).filter(
+        StockFinancials.targetDate >= get_threshold_date(within_months)
+    ).distinct().all()
+    return {row.symbol for row in rows}
+
+
+def get_latest_market_caps(session: Session) -> dict[str, float]:
+    """
+    종목별 가장 최근 재무정보의 시가총액을 한 번의 쿼리로 조회
+    Returns: {symbol: marketCap} (시가총액이 없는 종목은 제외)
+    """
+    latest = session.query(
+        StockFinancials.stock_id,
+        func.max(StockFinancials.targetDate).label("targetDate"),
+    ).filter(StockFinancials.marketCap.isnot(None)).group_by(StockFinancials.stock_id).subquery()
+
+    rows = session.query(Stock.symbol, StockFinancials.marketCap).join(
+        StockFinancials, StockFinancials.stock_id == Stock.id
+    ).join(
+        latest,
+        (latest.c.stock_id == StockFinancials.stock_id) & (latest.c.targetDate == StockFinancials.targetDate),
+    ).all()
+    return {row.symbol: row.marketCap for row in rows if row.marketCap}
+
+
+def get_recent_financials(session: Session, symbol: str, within_months: int = 3) -> list[StockFinancials]:
+    """
+    특정 종목(symbol)에 대해 최근 N개월 이내 수집된 재무정보 조회
+    """
+    stock_id = get_stock_id(session, symbol)
+    if not stock_id:
+        return []
+
+    threshold_date = get_threshold_date(within_months)
 
     return session.query(StockFinancials).filter(
-        StockFinancials.stock_id == stock.id,
+        StockFinancials.stock_id == stock_id,
         StockFinancials.targetDate >= threshold_date
     ).all()
 
@@ -37,11 +77,7 @@ def insert_financials_bulk(session: Session, data: list[dict]) -> None:
         return
 
     # symbol → stock_id 매핑
-    symbols = {d["symbol"] for d in data}
-    stock_map = {
-        stock.symbol: stock.id
-        for stock in session.query(Stock).filter(Stock.symbol.in_(symbols)).all()
-    }
+    stock_map = get_stock_ids(session, {d["symbol"] for d in data})
 
     now = date.today()
     entities = []
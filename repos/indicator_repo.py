@@ -0,0 +1,76 @@
+# repos/indicator_repo.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.stock import Stock
+from models.stock_indicator import StockIndicator
+from repos.bulk_upsert import bulk_upsert
+from repos.stock_registry import get_stock_ids
+from datetime import date
+import time
+
+INDICATOR_COLUMNS = [
+    "sma20", "sma50", "sma200",
+    "ema20", "ema50", "ema200",
+    "rsi14", "atr14",
+    "bbUpper", "bbLower",
+    "volatility20",
+]
+
+
+def ensure_indicator_table(session: Session) -> None:
+    """
+    stock_indicator 테이블이 없으면 생성 (이미 있으면 아무것도 하지 않음)
+    """
+    StockIndicator.__table__.create(bind=session.get_bind(), checkfirst=True)
+
+
+def get_latest_indicator_timestamps(session: Session, interval: str = "1day") -> dict[str, date]:
+    """
+    종목별 마지막으로 계산된 지표 날짜를 한 번의 grouped 쿼리로 반환
+    Returns: {symbol: latest_date} (계산된 적 없는 종목은 포함되지 않음)
+    """
+    rows = session.query(
+        Stock.symbol,
+        func.max(StockIndicator.timestamp).label("latest"),
+    ).join(Stock, Stock.id == StockIndicator.stock_id).filter(
+        StockIndicator.interval == interval
+    ).group_by(Stock.symbol).all()
+    return {row.symbol: row.latest for row in rows}
+
+
+def insert_indicators_bulk(session: Session, data: list[dict], chunk_size: int = 1000) -> None:
+    """
+    계산된 지표를 bulk upsert
+    data: {symbol, timestamp, interval, sma20, ..., volatility20} 형태
+    """
+    if not data:
+        return
+
+    stock_map = get_stock_ids(session, {d["symbol"] for d in data})
+
+    rows = []
+    for row in data:
+        stock_id = stock_map.get(row["symbol"])
+        if not stock_id:
+            continue
+        values = {"stock_id": stock_id, "timestamp": row["timestamp"], "interval": row["interval"]}
+        for column in INDICATOR_COLUMNS:
+            values[column] = row.get(column)
+        rows.append(values)
+
+    started = time.perf_counter()
+    count = bulk_upsert(
+        session, StockIndicator, rows,
+        unique_keys=["stock_id", "timestamp", "interval"],
+        update_columns=INDICATOR_COLUMNS,
+        chunk_size=chunk_size,
+        commit_per_chunk=True,
+    )
+    session.commit()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"💾 지표 {count}건 upsert "
+        f"({count / max(elapsed, 1e-6):,.0f} rows/sec)"
+    )
@@ -1,6 +1,38 @@
 from models.stock_market import StockMarket
 from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import func
+from repos.bulk_upsert import bulk_upsert
+from datetime import date
+
+
+def get_latest_market_timestamp(session: Session, name: str) -> date | None:
+    """
+    stock_market 테이블에서 해당 지표(name)의 가장 최신 timestamp 반환
+    """
+    return session.query(func.max(StockMarket.timestamp)).filter(
+        StockMarket.name == name
+    ).scalar()
+
+
+def get_market_values_since(session: Session, name: str, since: date) -> dict[date, float]:
+    """
+    해당 지표의 since 이후 저장값을 {timestamp: value}로 반환
+    """
+    rows = session.query(StockMarket.timestamp, StockMarket.value).filter(
+        StockMarket.name == name,
+        StockMarket.timestamp >= since
+    ).all()
+    return {row.timestamp: row.value for row in rows}
+
+
+def upsert_market_metrics(session: Session, metrics: list[dict]) -> int:
+    """
+    stock_market 테이블에 {name, timestamp, value} 리스트를 bulk upsert 후 commit
+    Returns: upsert한 row 수
+    """
+    count = bulk_upsert(session, StockMarket, metrics, unique_keys=["name", "timestamp"])
+    session.commit()
+    return count
 
 
 def insert_vix_data(session: Session, vix_list: list[dict]):
@@ -10,50 +42,22 @@ def insert_vix_data(session: Session, vix_list: list[dict]):
         session (Session): SQLAlchemy 세션
         vix_list (List[Dict]): [{"date": "2023-01-01", "value": 18.3}, ...]
     """
-    for item in vix_list:
-        existing = session.query(StockMarket).filter_by(
-            name="VIX",
-            timestamp=item["date"]
-        ).first()
-
-        if existing:
-            existing.value = item["value"]
-            existing.updatedAt = datetime.now()
-        else:
-            entity = StockMarket(
-                name="VIX",
-                timestamp=item["date"],
-                value=item["value"],
-                createdAt=datetime.now(),
-                updatedAt=datetime.now()
-            )
-            session.add(entity)
-    session.commit()
+    count = upsert_market_metrics(session, [
+        {"name": "VIX", "timestamp": item["date"], "value": item["value"]}
+        for item in vix_list
+    ])
+    print(f"✅ VIX {count}건 upsert")
 
 
 def insert_fed_rate_data(session: Session, fed_list: list[dict]):
     """
     기준금리 데이터를 stock_market 테이블에 저장 (name='FEDFUNDS_AVERAGE')
     """
-    for item in fed_list:
-        existing = session.query(StockMarket).filter_by(
-            name="FEDFUNDS_AVERAGE",
-            timestamp=item["date"]
-        ).first()
-
-        if existing:
-            existing.value = item["value"]
-            existing.updatedAt = datetime.now()
-        else:
-            entity = StockMarket(
-                name="FEDFUNDS_AVERAGE",
-                timestamp=item["date"],
-                value=item["value"],
-                createdAt=datetime.now(),
-                updatedAt=datetime.now()
-            )
-            session.add(entity)
-    session.commit()
+    count = upsert_market_metrics(session, [
+        {"name": "FEDFUNDS_AVERAGE", "timestamp": item["date"], "value": item["value"]}
+        for item in fed_list
+    ])
+    print(f"✅ 기준금리 {count}건 upsert")
 
 
 def insert_market_metrics(session: Session, metrics: list[dict]):
@@ -66,22 +70,8 @@ def insert_market_metrics(session: Session, metrics: list[dict]):
         ...
     ]
     """
-    for item in metrics:
-        existing = session.query(StockMarket).filter_by(
-            name=item["name"],
-            timestamp=item["timestamp"]
-        ).first()
-
-        if existing:
-            existing.value = item["value"]
-            existing.updatedAt = datetime.now()
-        else:
-            entity = StockMarket(
-                name=item["name"],
-                timestamp=item["timestamp"],
-                value=item["value"],
-                createdAt=datetime.now(),
-                updatedAt=datetime.now()
-            )
-            session.add(entity)
-    session.commit()
+    count = upsert_market_metrics(session, [
+        {"name": item["name"], "timestamp": item["timestamp"], "value": item["value"]}
+        for item in metrics
+    ])
+    print(f"✅ 마켓 지표 {count}건 upsert")
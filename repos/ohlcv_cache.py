@@ -0,0 +1,158 @@
+# repos/ohlcv_cache.py
+
+"""
+stock_ohlcv의 로컬 컬럼형 캐시 (interval/종목별 .npy 파일)
+- insert_ohlcv_bulk가 DB에 commit한 BarBatch를 그대로 병합 저장 → DB와 같은 내용을 유지
+- 캐시가 없거나 DB보다 늦게 시작하는 종목은 ohlcv_repo.sync_ohlcv_cache가 DB 전체 구간으로 재구성
+- 읽기는 np.load(mmap_mode="r")로 파일을 메모리 매핑하고 날짜 범위를 searchsorted로 잘라
+  복사 없이 BarBatch(view)로 반환
+- 파일 구조: {OHLCV_CACHE_DIR}/{interval}/{symbol}.npy (timestamp 오름차순 structured array)
+"""
+
+import os
+import threading
+import numpy as np
+from datetime import date
+from models.bar_batch import BarBatch
+
+OHLCV_CACHE_DIR = os.getenv("OHLCV_CACHE_DIR", "./cache/ohlcv")
+OHLCV_CACHE_ENABLED = os.getenv("OHLCV_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+BAR_DTYPE = np.dtype([
+    ("timestamp", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+_write_lock = threading.Lock()
+
+
+def get_cache_path(symbol: str, interval: str, cache_dir: str = OHLCV_CACHE_DIR) -> str:
+    return os.path.join(cache_dir, interval, f"{symbol}.npy")
+
+
+def to_records(batch: BarBatch) -> np.ndarray:
+    """
+    BarBatch를 캐시 파일 형식(structured array)으로 변환
+    """
+    records = np.empty(len(batch), dtype=BAR_DTYPE)
+    records["timestamp"] = batch.timestamps.astype("datetime64[D]")
+    for field in ("open", "high", "low", "close", "volume"):
+        records[field] = getattr(batch, field)
+    return records
+
+
+def merge_records(existing: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    기존 캐시와 새 bar를 timestamp 기준으로 병합 (같은 날짜는 새 값으로 덮어씀 → upsert와 동일)
+    """
+    if not len(new):
+        return existing
+
+    # 뒤쪽(새 값)이 남도록 뒤집은 뒤 첫 번째 등장만 유지 (np.unique 결과는 timestamp 오름차순)
+    reversed_ = np.concatenate([existing, new])[::-1]
+    _, first = np.unique(reversed_["timestamp"], return_index=True)
+    return reversed_[first]
+
+
+def write_records(path: str, records: np.ndarray) -> None:
+    """
+    임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, records)
+    os.replace(tmp_path, path)
+
+
+def load_records(path: str, mmap: bool = True) -> np.ndarray:
+    if not os.path.exists(path):
+        return np.empty(0, dtype=BAR_DTYPE)
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def append_batches(batches: list[BarBatch], cache_dir: str = OHLCV_CACHE_DIR, replace: bool = False) -> int:
+    """
+    DB에 저장된 BarBatch들을 캐시에 병합
+    replace=True면 기존 파일을 무시하고 덮어씀 (DB에서 재구성할 때)
+    Returns: 갱신된 파일 수
+    """
+    if not OHLCV_CACHE_ENABLED or not batches:
+        return 0
+
+    # 같은 종목이 여러 묶음으로 들어올 수 있으므로 파일 단위로 모아서 한 번만 씀
+    grouped: dict[tuple[str, str], list[np.ndarray]] = {}
+    for batch in batches:
+        if len(batch):
+            grouped.setdefault((batch.symbol, batch.interval), []).append(to_records(batch))
+
+    with _write_lock:
+        for (symbol, interval), parts in grouped.items():
+            path = get_cache_path(symbol, interval, cache_dir)
+            new = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            existing = np.empty(0, dtype=BAR_DTYPE) if replace else load_records(path, mmap=False)
+            write_records(path, merge_records(existing, new))
+
+    return len(grouped)
+
+
+def read_bars(symbol: str, interval: str, start: date | None = None, end: date | None = None,
+              cache_dir: str = OHLCV_CACHE_DIR) -> BarBatch | None:
+    """
+    캐시에서 종목의 [start, end] 구간 bar를 읽음 (메모리 매핑된 배열의 view, 복사 없음)
+    캐시 파일이 없으면 None
+    """
+    path = get_cache_path(symbol, interval, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    records = np.load(path, mmap_mode="r")
+    timestamps = records["timestamp"]
+    lo = 0 if start is None else int(np.searchsorted(timestamps, np.datetime64(start, "D"), side="left"))
+    hi = len(records) if end is None else int(np.searchsorted(timestamps, np.datetime64(end, "D"), side="right"))
+    view = records[lo:hi]
+
+    return BarBatch(
+        symbol, interval, view["timestamp"],
+        view["open"], view["high"], view["low"], view["close"], view["volume"],
+    )
+
+
+def get_first_timestamps(interval: str, symbols: list[str], cache_dir: str = OHLCV_CACHE_DIR) -> dict[str, date]:
+    """
+    종목별 캐시의 첫 bar 날짜 (캐시 파일이 없거나 비어 있는 종목은 제외)
+    """
+    results = {}
+    for symbol in symbols:
+        records = load_records(get_cache_path(symbol, interval, cache_dir))
+        if len(records):
+            results[symbol] = records["timestamp"][0].item()
+    return results
+
+
+def list_cached_symbols(interval: str, cache_dir: str = OHLCV_CACHE_DIR) -> list[str]:
+    directory = os.path.join(cache_dir, interval)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".npy"))
+
+
+def read_universe(interval: str, symbols: list[str] | None = None, start: date | None = None,
+                  end: date | None = None, cache_dir: str = OHLCV_CACHE_DIR) -> dict[str, BarBatch]:
+    """
+    여러 종목의 구간 bar를 한 번에 읽음 (DB 조회 없이 스크리닝/지표 계산용)
+    Returns: {symbol: BarBatch} (캐시가 없거나 구간에 bar가 없는 종목은 제외)
+    """
+    if symbols is None:
+        symbols = list_cached_symbols(interval, cache_dir)
+
+    results = {}
+    for symbol in symbols:
+        batch = read_bars(symbol, interval, start, end, cache_dir)
+        if batch is not None and len(batch):
+            results[symbol] = batch
+    return results
@@ -1,70 +1,189 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 from models.stock_ohlcv import StockOhlcv
 from models.stock import Stock
-from datetime import datetime
+from models.bar_batch import BarBatch
+from repos.bulk_upsert import bulk_upsert
+from repos import ohlcv_cache
+from repos.stock_registry import get_stock_id, get_stock_ids
 from datetime import date
 from sqlalchemy import func
+import os
+import time
+
+OHLCV_CHUNK_SIZE = int(os.getenv("OHLCV_UPSERT_CHUNK_SIZE", 1000))
 
 def get_latest_ohlcv_timestamp(session: Session, symbol: str, interval: str) -> date | None:
     """
     해당 symbol + interval 조합의 가장 최신 timestamp 반환
     """
-    stock = session.query(Stock).filter_by(symbol=symbol).first()
-    if not stock:
+    stock_id = get_stock_id(session, symbol)
+    if not stock_id:
         print(f"⚠️ {symbol} 은 stock 테이블에 존재하지 않음 → 건너뜀")
         return None
 
     row = session.query(func.max(StockOhlcv.timestamp)).filter(
-        StockOhlcv.stock_id == stock.id,
+        StockOhlcv.stock_id == stock_id,
         StockOhlcv.interval == interval
     ).scalar()
 
     return row  # None일 수 있음
 
-def insert_ohlcv_bulk(session: Session, data: list[dict]):
+def get_latest_ohlcv_timestamps(session: Session, intervals: list[str] | None = None) -> dict[tuple[str, str], date]:
+    """
+    전체 종목의 interval별 가장 최신 timestamp를 한 번의 grouped 쿼리로 반환
+    Returns: {(symbol, interval): latest_date} (데이터가 없는 조합은 포함되지 않음)
+    """
+    query = session.query(
+        Stock.symbol,
+        StockOhlcv.interval,
+        func.max(StockOhlcv.timestamp).label("latest"),
+    ).join(Stock, Stock.id == StockOhlcv.stock_id)
+
+    if intervals:
+        query = query.filter(StockOhlcv.interval.in_(intervals))
+
+    rows = query.group_by(Stock.symbol, StockOhlcv.interval).all()
+    return {(row.symbol, row.interval): row.latest for row in rows}
+
+def insert_ohlcv_bulk(session: Session, data: list[BarBatch], chunk_size: int = OHLCV_CHUNK_SIZE):
     """
-    수집된 OHLCV 리스트를 bulk upsert
+    수집된 종목별 BarBatch 리스트를 bulk upsert
     - 중복된 (stock_id, timestamp, interval) 조합이 있으면 update
+    - chunk_size개씩 multi-row로 실행하고 chunk마다 commit
+    - commit된 묶음은 로컬 컬럼형 캐시(ohlcv_cache)에도 병합
     """
     if not data:
         return
 
-    symbols = {d["symbol"] for d in data}
-    stock_map = {
-        stock.symbol: stock.id
-        for stock in session.query(Stock).filter(Stock.symbol.in_(symbols)).all()
-    }
+    stock_map = get_stock_ids(session, {batch.symbol for batch in data})
 
-    now = datetime.now()
-
-    for row in data:
-        symbol = row["symbol"]
-        stock_id = stock_map.get(symbol)
+    rows = []
+    saved = []
+    for batch in data:
+        stock_id = stock_map.get(batch.symbol)
         if not stock_id:
-            print(f"⚠️ {symbol} 은 stock 테이블에 존재하지 않음 → 건너뜀")
+            print(f"⚠️ {batch.symbol} 은 stock 테이블에 존재하지 않음 → 건너뜀")
             continue
+        saved.append(batch)
 
-        stmt = mysql_insert(StockOhlcv).values(
-            stock_id=stock_id,
-            timestamp=row["timestamp"],
-            interval=row["interval"],
-            open=row["open"],
-            high=row["high"],
-            low=row["low"],
-            close=row["close"],
-            volume=row["volume"],
-            createdAt=now,
-            updatedAt=now,
+        interval = batch.interval
+        rows.extend(
+            {
+                "stock_id": stock_id,
+                "timestamp": timestamp,
+                "interval": interval,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+            }
+            for timestamp, open_, high, low, close, volume in batch.iter_values()
         )
 
-        update_stmt = stmt.on_duplicate_key_update(
-            open=stmt.inserted.open,
-            high=stmt.inserted.high,
-            low=stmt.inserted.low,
-            close=stmt.inserted.close,
-            volume=stmt.inserted.volume,
-            updatedAt=stmt.inserted.updatedAt,
-        )
-        session.execute(update_stmt)
-    session.commit()
\ No newline at end of file
+    started = time.perf_counter()
+    count = bulk_upsert(
+        session, StockOhlcv, rows,
+        unique_keys=["stock_id", "timestamp", "interval"],
+        update_columns=["open", "high", "low", "close", "volume"],
+        chunk_size=chunk_size,
+        commit_per_chunk=True,
+    )
+    session.commit()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"💾 OHLCV {count}건 upsert "
+        f"({count / max(elapsed, 1e-6):,.0f} rows/sec)"
+    )
+
+    # 캐시는 DB의 사본이므로 실패해도 수집은 계속 진행 (다음 수집 때 sync_ohlcv_cache가 복구)
+    try:
+        ohlcv_cache.append_batches(saved)
+    except Exception as e:
+        print(f"⚠️ OHLCV 캐시 갱신 실패: {e}")
+
+def get_ohlcv_since(session: Session, symbol_since: dict[str, date], interval: str) -> list[BarBatch]:
+    """
+    종목별 시작일(symbol_since) 이후의 OHLCV를 한 번의 쿼리로 조회
+    - 가장 이른 시작일 기준으로 가져온 뒤 종목별 시작일로 다시 거름
+    Returns: 종목별 BarBatch 리스트 (날짜 오름차순)
+    """
+    if not symbol_since:
+        return []
+
+    min_since = min(symbol_since.values())
+    rows = session.query(
+        Stock.symbol,
+        StockOhlcv.timestamp,
+        StockOhlcv.open,
+        StockOhlcv.high,
+        StockOhlcv.low,
+        StockOhlcv.close,
+        StockOhlcv.volume,
+    ).join(Stock, Stock.id == StockOhlcv.stock_id).filter(
+        Stock.symbol.in_(symbol_since.keys()),
+        StockOhlcv.interval == interval,
+        StockOhlcv.timestamp >= min_since,
+    ).order_by(Stock.symbol, StockOhlcv.timestamp).all()
+
+    grouped: dict[str, list] = {}
+    for row in rows:
+        if row.timestamp >= symbol_since[row.symbol]:
+            grouped.setdefault(row.symbol, []).append(row)
+
+    return [
+        BarBatch.from_rows(symbol, interval, [row._mapping for row in symbol_rows])
+        for symbol, symbol_rows in grouped.items()
+    ]
+
+def get_first_ohlcv_timestamps(session: Session, symbols: list[str], interval: str) -> dict[str, date]:
+    """
+    종목별 가장 이른 timestamp를 한 번의 grouped 쿼리로 반환 (데이터가 없는 종목은 제외)
+    """
+    if not symbols:
+        return {}
+
+    rows = session.query(
+        Stock.symbol,
+        func.min(StockOhlcv.timestamp).label("first"),
+    ).join(Stock, Stock.id == StockOhlcv.stock_id).filter(
+        Stock.symbol.in_(symbols),
+        StockOhlcv.interval == interval,
+    ).group_by(Stock.symbol).all()
+    return {row.symbol: row.first for row in rows}
+
+def sync_ohlcv_cache(session: Session, interval: str, symbols: list[str] | None = None,
+                     chunk_size: int = 50) -> list[str]:
+    """
+    캐시 파일이 없거나 DB보다 늦게 시작하는 종목만 DB 전체 구간으로 캐시를 다시 생성
+    (insert_ohlcv_bulk는 새로 upsert한 bar만 캐시에 붙이므로 기존 DB에서는 최초 1회 필요)
+    Returns: 재구성한 종목 리스트
+    """
+    if not ohlcv_cache.OHLCV_CACHE_ENABLED:
+        return []
+    if symbols is None:
+        symbols = [row.symbol for row in session.query(Stock.symbol).all()]
+
+    db_first = get_first_ohlcv_timestamps(session, symbols, interval)
+    cache_first = ohlcv_cache.get_first_timestamps(interval, list(db_first))
+    stale = [
+        symbol for symbol, first in db_first.items()
+        if symbol not in cache_first or cache_first[symbol] > first
+    ]
+
+    for i in range(0, len(stale), chunk_size):
+        rebuild_ohlcv_cache(session, interval, stale[i:i + chunk_size])
+    return stale
+
+def rebuild_ohlcv_cache(session: Session, interval: str, symbols: list[str] | None = None,
+                        since: date = date(1900, 1, 1)):
+    """
+    DB의 stock_ohlcv 내용으로 로컬 캐시를 다시 생성 (최초 구축 또는 캐시 손상 시)
+    """
+    if symbols is None:
+        symbols = [row.symbol for row in session.query(Stock.symbol).all()]
+
+    batches = get_ohlcv_since(session, {symbol: since for symbol in symbols}, interval)
+    count = ohlcv_cache.append_batches(batches, replace=True)
+    print(f"✅ {interval} OHLCV 캐시 재구성 완료: {count}개 종목")
@@ -1,54 +1,61 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 from models.stock_ohlcv_today import StockOhlcvToday
-from models.stock import Stock
+from models.bar_batch import BarBatch
+from repos.bulk_upsert import bulk_upsert
+from repos.stock_registry import get_stock_ids
 from datetime import datetime
+import os
+import time
 
-def insert_ohlcv_today_bulk(session: Session, data: list[dict]):
+OHLCV_TODAY_CHUNK_SIZE = int(os.getenv("OHLCV_UPSERT_CHUNK_SIZE", 1000))
+
+
+def insert_ohlcv_today_bulk(session: Session, data: list[BarBatch], chunk_size: int = OHLCV_TODAY_CHUNK_SIZE):
     """
-    실시간 분봉 OHLCV 데이터를 bulk upsert
+    실시간 분봉 BarBatch 리스트를 bulk upsert
     - 중복된 (stock_id, interval, timestamp) 조합이 있으면 update
+    - chunk_size개씩 multi-row로 실행하고 chunk마다 commit
     """
     if not data:
         return
 
-    symbols = {d["symbol"] for d in data}
-    stock_map = {
-        stock.symbol: stock.id
-        for stock in session.query(Stock).filter(Stock.symbol.in_(symbols)).all()
-    }
+    stock_map = get_stock_ids(session, {batch.symbol for batch in data})
 
-    now = datetime.utcnow()
-    for row in data:
-        symbol = row["symbol"]
-        stock_id = stock_map.get(symbol)
+    rows = []
+    for batch in data:
+        stock_id = stock_map.get(batch.symbol)
         if not stock_id:
-            print(f"⚠️ {symbol} 은 stock 테이블에 없음 → 건너뜀")
+            print(f"⚠️ {batch.symbol} 은 stock 테이블에 없음 → 건너뜀")
             continue
 
-        stmt = mysql_insert(StockOhlcvToday).values(
-            stock_id=stock_id,
-            interval=row["interval"],
-            timestamp=row["timestamp"],
-            open=row["open"],
-            high=row["high"],
-            low=row["low"],
-            close=row["close"],
-            volume=row["volume"],
-            createdAt=now,
-            updatedAt=now,
-        )
-
-        update_stmt = stmt.on_duplicate_key_update(
-            open=stmt.inserted.open,
-            high=stmt.inserted.high,
-            low=stmt.inserted.low,
-            close=stmt.inserted.close,
-            volume=stmt.inserted.volume,
-            updatedAt=stmt.inserted.updatedAt,
+        interval = batch.interval
+        rows.extend(
+            {
+                "stock_id": stock_id,
+                "timestamp": timestamp,
+                "interval": interval,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+            }
+            for timestamp, open_, high, low, close, volume in batch.iter_values()
         )
 
-        session.execute(update_stmt)
-
+    started = time.perf_counter()
+    count = bulk_upsert(
+        session, StockOhlcvToday, rows,
+        unique_keys=["stock_id", "interval", "timestamp"],
+        update_columns=["open", "high", "low", "close", "volume"],
+        chunk_size=chunk_size,
+        commit_per_chunk=True,
+        now=datetime.utcnow(),
+    )
     session.commit()
-    print(f"✅ 총 {len(data)}개의 분봉 OHLCV 데이터 upsert 완료")
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"✅ 총 {count}개의 분봉 OHLCV 데이터 upsert 완료 "
+        f"({count / max(elapsed, 1e-6):,.0f} rows/sec)"
+    )
@@ -0,0 +1,51 @@
+# repos/return_repo.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.stock_return import StockReturn
+from repos.bulk_upsert import bulk_upsert
+from datetime import date
+
+RETURN_HORIZONS = ["1W"] + [f"{i}M" for i in range(1, 13)] + ["YTD"]
+RETURN_COLUMNS = [f"return{horizon}" for horizon in RETURN_HORIZONS]
+
+
+def ensure_return_table(session: Session) -> None:
+    """
+    stock_return 테이블이 없으면 생성 (이미 있으면 아무것도 하지 않음)
+    """
+    StockReturn.__table__.create(bind=session.get_bind(), checkfirst=True)
+
+
+def insert_returns_bulk(session: Session, data: list[dict]) -> None:
+    """
+    종목/지수별 기간 수익률을 bulk upsert
+    data: {symbol, timestamp, return1W, return1M, ..., returnYTD} 형태
+    """
+    if not data:
+        return
+
+    count = bulk_upsert(
+        session, StockReturn, data,
+        unique_keys=["symbol", "timestamp"],
+        update_columns=RETURN_COLUMNS,
+    )
+    session.commit()
+    print(f"💾 기간 수익률 {count}건 upsert")
+
+
+def get_top_returns(session: Session, horizon: str, as_of: date | None = None, limit: int = 20,
+                    ascending: bool = False) -> list[StockReturn]:
+    """
+    기준일의 특정 기간 수익률 순위 (기준일이 없으면 가장 최근 기준일)
+    """
+    column = getattr(StockReturn, f"return{horizon}")
+    if as_of is None:
+        as_of = session.query(func.max(StockReturn.timestamp)).scalar()
+        if as_of is None:
+            return []
+
+    return session.query(StockReturn).filter(
+        StockReturn.timestamp == as_of,
+        column.isnot(None),
+    ).order_by(column.asc() if ascending else column.desc()).limit(limit).all()
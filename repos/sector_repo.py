@@ -2,29 +2,26 @@
 
 from sqlalchemy.orm import Session
 from models.sector_performance import SectorPerformance
-from datetime import datetime, timezone
+from repos.bulk_upsert import bulk_upsert
+from sqlalchemy import func
+from datetime import date, datetime, timezone
+
+
+def get_latest_sector_date(session: Session) -> date | None:
+    return session.query(func.max(SectorPerformance.date)).scalar()
 
 
 def insert_sector_performance(session: Session, data: list[dict]):
+    """
+    섹터별 수익률(%) upsert
+    data: {sector, return, date(없으면 오늘)} 형태
+    """
     today = datetime.now(timezone.utc).date()
 
-    for row in data:
-        entity = session.query(SectorPerformance).filter_by(
-            date=today,
-            sector=row["sector"]
-        ).first()
-
-        if entity:
-            entity.return_ = row["return"]
-            entity.updatedAt = datetime.now()
-        else:
-            entity = SectorPerformance(
-                date=today,
-                sector=row["sector"],
-                return_=row["return"],
-                createdAt=datetime.now(),
-                updatedAt=datetime.now(),
-            )
-            session.add(entity)
+    count = bulk_upsert(session, SectorPerformance, [
+        {"date": row.get("date", today), "sector": row["sector"], "return": row["return"]}
+        for row in data
+    ], unique_keys=["date", "sector"])
 
     session.commit()
+    print(f"✅ 섹터 수익률 {count}건 upsert")
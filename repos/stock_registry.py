@@ -0,0 +1,82 @@
+# repos/stock_registry.py
+
+"""
+프로세스 전역 symbol → stock_id 캐시
+- 최초 사용 시 stock 테이블 전체를 한 번에 로딩
+- stock_repo.insert_stocks가 종목을 추가하면 다시 로딩
+- 캐시에 없는 심볼은 다른 프로세스가 추가했을 수 있으므로 일정 간격 이상 지났을 때만 다시 로딩
+"""
+
+import threading
+import time
+from sqlalchemy.orm import Session
+from models.stock import Stock
+
+MISS_RELOAD_INTERVAL_SEC = 300
+
+
+class SymbolRegistry:
+    def __init__(self):
+        self.ids: dict[str, int] | None = None
+        self.loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def refresh(self, session: Session) -> None:
+        rows = session.query(Stock.symbol, Stock.id).all()
+        with self.lock:
+            self.ids = {row.symbol: row.id for row in rows}
+            self.loaded_at = time.monotonic()
+
+    def get_ids(self, session: Session, symbols) -> dict[str, int]:
+        """
+        주어진 심볼들의 {symbol: stock_id} 반환 (stock 테이블에 없는 심볼은 제외)
+        """
+        symbols = set(symbols)
+        with self.lock:
+            ids, loaded_at = self.ids, self.loaded_at
+
+        stale = time.monotonic() - loaded_at >= MISS_RELOAD_INTERVAL_SEC
+        if ids is None or (not symbols.issubset(ids) and stale):
+            self.refresh(session)
+            with self.lock:
+                ids = self.ids
+
+        found = {symbol: ids[symbol] for symbol in symbols if symbol in ids}
+        with self.lock:
+            self.hits += len(found)
+            self.misses += len(symbols) - len(found)
+        return found
+
+    def get_id(self, session: Session, symbol: str) -> int | None:
+        return self.get_ids(session, [symbol]).get(symbol)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.ids or {}),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+registry = SymbolRegistry()
+
+
+def get_stock_id(session: Session, symbol: str) -> int | None:
+    return registry.get_id(session, symbol)
+
+
+def get_stock_ids(session: Session, symbols) -> dict[str, int]:
+    return registry.get_ids(session, symbols)
+
+
+def refresh_registry(session: Session) -> None:
+    registry.refresh(session)
+
+
+def get_registry_stats() -> dict:
+    """
+    Returns: {"size": 캐시된 종목 수, "hits": 조회 성공 수, "misses": 조회 실패 수}
+    """
+    return registry.stats()
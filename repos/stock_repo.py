@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from models.stock import Stock
-from datetime import datetime
+from repos.bulk_upsert import bulk_upsert
+from repos.stock_registry import refresh_registry
 
 def insert_stocks(session: Session, stock_list: list[dict]):
     """
@@ -17,21 +18,30 @@ def insert_stocks(session: Session, stock_list: list[dict]):
         ...
     ]
     """
-    for item in stock_list:
-        entity = Stock(
-            symbol=item["symbol"],
-            name=item["name"],
-            sector=item.get("sector") or "",
-            industry=item.get("industry") or "",
-            createdAt=datetime.now(),
-            updatedAt=datetime.now()
-        )
-        session.merge(entity)  # symbol에 UNIQUE 제약이 있으므로 UPSERT 가능
+    count = bulk_upsert(session, Stock, [
+        {
+            "symbol": item["symbol"],
+            "name": item["name"],
+            "sector": item.get("sector") or "",
+            "industry": item.get("industry") or "",
+        }
+        for item in stock_list
+    ], unique_keys=["symbol"])  # symbol에 UNIQUE 제약이 있으므로 UPSERT 가능
     session.commit()
+    if count:
+        refresh_registry(session)  # 새 종목의 stock_id를 캐시에 반영
+    print(f"✅ 종목 {count}건 upsert")
 
 def get_existing_symbols(session: Session, symbols: list[str]) -> set[str]:
     """
     주어진 심볼 중 이미 DB에 존재하는 심볼들을 반환
     """
     rows = session.query(Stock.symbol).filter(Stock.symbol.in_(symbols)).all()
-    return {row.symbol for row in rows}
\ No newline at end of file
+    return {row.symbol for row in rows}
+
+def get_symbol_sectors(session: Session) -> dict[str, str]:
+    """
+    섹터 정보가 있는 전체 종목의 {symbol: sector}
+    """
+    rows = session.query(Stock.symbol, Stock.sector).filter(Stock.sector.isnot(None), Stock.sector != "").all()
+    return {row.symbol: row.sector for row in rows}
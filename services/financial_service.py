@@ -1,24 +1,60 @@
 # services/financial_service.py
 
 from collectors import fmp_financial_sector_collector
+from collectors.fmp_financial_sector_collector import FinancialDataIncompleteError
+from collectors.key_pool import ApiQuotaExhaustedError
 from repos import financial_repo
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from services.upsert_pipeline import UpsertPipeline
 
-def collect_missing_financials(session: Session, symbols: List[str]):
+def collect_missing_financials(session: Session, symbols: List[str], max_workers: int = 8, chunk_size: int = 50):
     """
     최근 3개월 이내 재무데이터가 없는 종목에 대해서만 FMP API를 통해 수집 수행
+    - 대상 종목을 max_workers개 스레드로 동시에 수집
+    - 수집 결과는 writer 스레드가 최대 chunk_size개씩 모아 insert
     """
     today = datetime.today()
     month_within = 3
 
-    for symbol in symbols:
-        if financial_repo.get_recent_financials(session, symbol, month_within):
-            print(f"⏩ {symbol}: 최근 데이터 존재 → 스킵")
-            continue
+    fresh_symbols = financial_repo.get_fresh_financial_symbols(session, month_within)
+    target_symbols = [symbol for symbol in symbols if symbol not in fresh_symbols]
+    print(f"⏩ {len(symbols) - len(target_symbols)}개 종목: 최근 데이터 존재 → 스킵")
 
-        data = fmp_financial_sector_collector.collect_fmp_stock_financials(symbol, today)
-        if data:
-            # insert_financial_data()는 미리 작성된 bulk upsert용 함수로 가정
-            financial_repo.insert_financials_bulk(session, [data])
\ No newline at end of file
+    if not target_symbols:
+        print("✅ 모든 종목의 재무 데이터가 최신 상태입니다.")
+        return
+
+    with UpsertPipeline(session, financial_repo.insert_financials_bulk, name="financials", flush_rows=chunk_size,
+                        flush_on_idle=False) as pipeline, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fmp_financial_sector_collector.collect_fmp_stock_financials, symbol, today): symbol
+            for symbol in target_symbols
+        }
+
+        for future in as_completed(futures):
+            symbol = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                data = future.result()
+            except FinancialDataIncompleteError as e:
+                print(f"❌ {e}")
+                continue
+            except ApiQuotaExhaustedError as e:
+                # 모든 키의 일일 한도 소진 → 남은 종목은 다음 배치에서 수집
+                print(f"⛔ {e} 남은 종목 수집 중단")
+                for pending in futures:
+                    pending.cancel()
+                continue
+            except Exception as e:
+                print(f"⚠️ {symbol} 재무 데이터 수집 중 예외 발생: {e}")
+                continue
+
+            if data:
+                pipeline.put([data])
+
+    print(f"✅ {pipeline.submitted}/{len(target_symbols)}개 종목 재무 데이터 저장 처리 완료")
@@ -0,0 +1,142 @@
+# services/indicator_service.py
+
+"""
+일봉으로부터 기술적 지표(SMA/EMA/RSI/ATR/볼린저 밴드/변동성)를 전 종목 한 번에 계산
+- 종목 × 날짜 2차원 NumPy 패널에서 컬럼(날짜) 방향으로 벡터 연산 → 종목별 파이썬 루프 없음
+- 마지막으로 계산된 날짜 이후만 저장하고, 그 이전 WARMUP_BARS 구간은 EMA/RSI 수렴용으로만 사용
+"""
+
+from sqlalchemy.orm import Session
+from repos import indicator_repo
+from services.panel import load_history, build_panel, forward_fill, shift
+from utils.dates import session_offset
+import numpy as np
+import math
+import time
+
+# EMA200이 충분히 수렴하도록 새로 저장할 날짜 이전에 함께 읽는 구간 (거래일 기준)
+WARMUP_BARS = 600
+TRADING_DAYS_PER_YEAR = 252
+FLUSH_ROWS = 20000
+
+
+def rolling(values: np.ndarray, window: int, fn, **kwargs) -> np.ndarray:
+    """
+    날짜 방향 window 크기 이동 집계 (window 안에 NaN이 있으면 NaN)
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+        out[:, window - 1:] = fn(windows, axis=-1, **kwargs)
+    return out
+
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    지수평활 (첫 유효값에서 시작, adjust=False와 동일)
+    - 날짜 축으로만 루프를 돌고 종목 축은 한 번에 계산
+    - 유효값이 min_periods개 미만인 칸은 NaN
+    """
+    out = np.full(values.shape, np.nan)
+    state = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        state = np.where(np.isnan(state), x, state + alpha * (x - state))
+        out[:, t] = state
+
+    out[np.cumsum(~np.isnan(values), axis=1) < min_periods] = np.nan
+    return out
+
+
+def compute_indicator_panel(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    (종목 × 날짜) 고가/저가/종가 패널로 전체 지표 패널 계산
+    Returns: {지표 컬럼명: 2차원 배열}
+    """
+    prev_close = shift(close)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = close - prev_close
+        gains = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+        losses = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+        avg_gain = ewm(gains, 1 / 14, 14)
+        avg_loss = ewm(losses, 1 / 14, 14)
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)  # avg_loss가 0이면 100
+
+        # 전일 종가가 없으면 당일 고가-저가
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+        log_returns = np.log(close / prev_close)
+
+    sma20 = rolling(close, 20, np.mean)
+    band = 2 * rolling(close, 20, np.std)
+
+    return {
+        "sma20": sma20,
+        "sma50": rolling(close, 50, np.mean),
+        "sma200": rolling(close, 200, np.mean),
+        "ema20": ewm(close, 2 / 21, 20),
+        "ema50": ewm(close, 2 / 51, 50),
+        "ema200": ewm(close, 2 / 201, 200),
+        "rsi14": rsi,
+        "atr14": ewm(true_range, 1 / 14, 14),
+        "bbUpper": sma20 + band,
+        "bbLower": sma20 - band,
+        "volatility20": rolling(log_returns, 20, np.std, ddof=1) * math.sqrt(TRADING_DAYS_PER_YEAR) * 100,
+    }
+
+
+def compute_indicators(session: Session, symbols: list[str], interval: str = "1day", full_refresh: bool = False):
+    """
+    전 종목 기술적 지표를 계산하여 stock_indicator 테이블에 저장
+    - 마지막 계산일 이후의 날짜만 upsert (full_refresh=True면 전체 재계산)
+    - 계산 전 구간은 로컬 캐시/DB에서 warmup 구간까지 포함해 한 번에 읽음
+    """
+    started = time.perf_counter()
+    indicator_repo.ensure_indicator_table(session)
+
+    latest = {} if full_refresh else indicator_repo.get_latest_indicator_timestamps(session, interval)
+    # 종목별로 마지막 계산일의 WARMUP_BARS 전부터 읽음 (처음 계산하는 종목만 전체 구간)
+    since = {
+        symbol: session_offset(latest[symbol], -WARMUP_BARS) if symbol in latest else None
+        for symbol in symbols
+    }
+
+    batches = load_history(session, symbols, interval, since)
+    if not batches:
+        print("⏩ 지표를 계산할 OHLCV 없음 → 스킵")
+        return
+
+    panel_symbols, dates, panel = build_panel(batches)
+    has_bar = ~np.isnan(panel["close"])
+    # 다른 종목만 거래한 날짜 때문에 이동 구간이 끊기지 않도록 빈 칸은 직전 값으로 채워서 계산
+    indicators = compute_indicator_panel(*(forward_fill(panel[field]) for field in ("high", "low", "close")))
+    print(f"📈 {len(panel_symbols)}개 종목 × {len(dates)}일 지표 계산 ({time.perf_counter() - started:.1f}초)")
+
+    day_list = dates.tolist()
+    rows, total = [], 0
+    for i, symbol in enumerate(panel_symbols):
+        mask = has_bar[i].copy()
+        if symbol in latest:
+            mask &= dates > np.datetime64(latest[symbol], "D")
+
+        columns = np.flatnonzero(mask)
+        if not len(columns):
+            continue
+        values = {name: series[i, columns].tolist() for name, series in indicators.items()}
+
+        for j, column in enumerate(columns):
+            row = {"symbol": symbol, "timestamp": day_list[column], "interval": interval}
+            for name, series in values.items():
+                value = series[j]
+                row[name] = None if value != value else value  # NaN → NULL
+            rows.append(row)
+
+        if len(rows) >= FLUSH_ROWS:
+            indicator_repo.insert_indicators_bulk(session, rows)
+            total += len(rows)
+            rows = []
+
+    indicator_repo.insert_indicators_bulk(session, rows)
+    total += len(rows)
+    print(f"✅ 기술적 지표 {total}건 저장 완료 ({time.perf_counter() - started:.1f}초)")
@@ -2,25 +2,64 @@ from datetime import datetime, timedelta, timezone, date
 from collectors.fred_vix_fed_collector import fetch_vix_range, fetch_fed_rate_range
 from collectors.yfinance_snp500_collector import fetch_snp500_multi_returns
 from repos.market_repo import insert_vix_data, insert_fed_rate_data, insert_market_metrics
+from repos.market_repo import get_latest_market_timestamp, get_market_values_since
 from sqlalchemy.orm import Session
+import math
+
+FULL_REFRESH_DAYS = 365
+
+# 최신 저장일 이전 며칠까지 다시 받아 FRED의 사후 수정값을 반영할지
+VIX_REVISION_DAYS = 7
+FED_RATE_REVISION_DAYS = 62  # 월간 시계열이라 최근 2개월치
 
 
 def get_utc_today() -> date:
     return datetime.now(timezone.utc).date()
 
 
-def collect_vix(session: Session):
+def get_fetch_start(session: Session, name: str, revision_days: int, full_refresh: bool) -> date:
+    """
+    증분 수집 시작일 계산
+    - 저장된 데이터가 없거나 full_refresh면 1년 전부터
+    - 그 외에는 최신 저장일 - revision_days 부터
+    """
     today = get_utc_today()
-    one_year_ago = today - timedelta(days=365)
-    data = fetch_vix_range(start_date=one_year_ago, end_date=today)
-    insert_vix_data(session, data)
+    latest = None if full_refresh else get_latest_market_timestamp(session, name)
+    if latest is None:
+        return today - timedelta(days=FULL_REFRESH_DAYS)
+    return latest - timedelta(days=revision_days)
 
 
-def collect_fed_rate(session: Session):
+def filter_changed(session: Session, name: str, start_date: date, data: list[dict]) -> list[dict]:
+    """
+    이미 같은 값으로 저장된 관측치는 제외하고 신규/변경분만 반환
+    - value 컬럼은 MySQL FLOAT(단정밀도)이므로 float64 값과 상대 오차 1e-6 이내면 같은 값으로 봄
+    """
+    existing = get_market_values_since(session, name, start_date)
+    changed = []
+    for item in data:
+        saved = existing.get(date.fromisoformat(item["date"]))
+        if saved is None or not math.isclose(saved, item["value"], rel_tol=1e-6):
+            changed.append(item)
+    return changed
+
+
+def collect_vix(session: Session, full_refresh: bool = False):
+    today = get_utc_today()
+    start_date = get_fetch_start(session, "VIX", VIX_REVISION_DAYS, full_refresh)
+    data = fetch_vix_range(start_date=start_date, end_date=today)
+    delta = filter_changed(session, "VIX", start_date, data)
+    print(f"🔍 VIX {start_date}~{today}: {len(data)}건 수신, {len(delta)}건 신규/변경")
+    insert_vix_data(session, delta)
+
+
+def collect_fed_rate(session: Session, full_refresh: bool = False):
     today = get_utc_today()
-    one_year_ago = today - timedelta(days=365)
-    data = fetch_fed_rate_range(start_date=one_year_ago, end_date=today)
-    insert_fed_rate_data(session, data)
+    start_date = get_fetch_start(session, "FEDFUNDS_AVERAGE", FED_RATE_REVISION_DAYS, full_refresh)
+    data = fetch_fed_rate_range(start_date=start_date, end_date=today)
+    delta = filter_changed(session, "FEDFUNDS_AVERAGE", start_date, data)
+    print(f"🔍 FEDFUNDS {start_date}~{today}: {len(data)}건 수신, {len(delta)}건 신규/변경")
+    insert_fed_rate_data(session, delta)
 
 
 def collect_snp500_multi_returns(session: Session, base_date: date = None):
@@ -34,12 +73,15 @@ def collect_snp500_multi_returns(session: Session, base_date: date = None):
     insert_market_metrics(session, data)
 
 
-def collect_all_market_metrics(session: Session):
+def collect_all_market_metrics(session: Session, full_refresh: bool = False):
+    """
+    full_refresh=True면 VIX/기준금리를 최근 1년치 전체 다시 수집
+    """
     collect_snp500_multi_returns(session)
     print('현재로부터 12개월의 SNP 500 수익률 수집 완료.')
-    collect_vix(session)
+    collect_vix(session, full_refresh)
     print('VIX 수집완료')
-    collect_fed_rate(session)
+    collect_fed_rate(session, full_refresh)
     print('기준금리 수집완료')
 
 
@@ -1,49 +1,75 @@
 from sqlalchemy.orm import Session
-from collectors.twelvedata_ohlcv_collector import get_ohlcv_from_twelvedata
+from collectors.twelvedata_ohlcv_collector import fetch_time_series_batch, acquire_api_key, get_batch_size, key_pool
 from models.stock import Stock
-from datetime import datetime
-import time
+from models.bar_batch import BarBatch, count_bars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from repos import ohlcv_today_repo  # ✅ 레포 사용
+from services.upsert_pipeline import UpsertPipeline
+from utils.market_calendar import MARKET_TZ
+from datetime import datetime
+import numpy as np
+
 
-def collect_ohlcv_intraday(session: Session, symbols: list[str], intervals: list[str] = ["15min", "1h"]):
+def fetch_latest_intraday_batch(symbols: list[str], interval: str, bar_close: datetime | None = None) -> list[BarBatch]:
+    """
+    키별 rate limit 토큰(심볼 수만큼)을 확보한 뒤 배치 요청으로 종목별 최신 분봉 1개씩 수집
+    - timestamp 파싱은 collector에서 datetime64[s] 배열로 처리됨 (거래소 현지 시각, bar 시작 시각 기준)
+    - bar_close가 있으면 최근 2개를 받아 bar_close 이전에 시작한 (방금 끝난) bar를 저장
+      → 경계 직후에는 새로 시작된 bar가 가장 최신이므로 그대로 쓰면 몇 초 분량의 bar만 저장됨
+    """
+    api_key = acquire_api_key(len(symbols))
+    results, failures = fetch_time_series_batch(symbols, interval, 1 if bar_close is None else 2, api_key)
+
+    for symbol, reason in failures.items():
+        print(f"❌ {symbol} ({interval}) 수집 실패: {reason}")
+
+    if bar_close is None:
+        return [batch.latest() for batch in results.values() if len(batch)]
+
+    boundary = np.datetime64(bar_close.astimezone(MARKET_TZ).replace(tzinfo=None), "s")
+    bars = [batch.latest_before(boundary) for batch in results.values()]
+    return [bar for bar in bars if bar is not None]
+
+
+def collect_ohlcv_intraday(session: Session, symbols: list[str], intervals: list[str] = ["15min", "1h"],
+                           max_workers: int | None = None, batch_size: int | None = None,
+                           bar_close: datetime | None = None):
     """
     실시간 분봉 OHLCV 데이터를 수집하여 stock_ohlcv_today 테이블에 저장
+    - bar_close: 방금 지난 bar 경계 시각 (이 시각 이전에 시작한 bar 중 최신 bar를 저장)
+    - 심볼을 배치 크기로 묶어 요청하고, 여러 배치를 동시에 보냄
+    - 속도는 키별 token bucket(분당 크레딧)으로 제한
+    - 수집된 배치는 writer 스레드가 바로 upsert
     """
-    count = 1
-    today_utc = datetime.utcnow()
-    all_results = []
+    if max_workers is None:
+        max_workers = max(4, len(key_pool.keys) * 4)  # 키가 늘어날수록 동시 요청 수도 늘림
+    if batch_size is None:
+        batch_size = get_batch_size()
 
-    # ⏱ 슬립 시간 설정
-    sleep_time = 0.8 if "1h" in intervals else 0.5
+    tasks = [
+        (symbols[i:i + batch_size], interval)
+        for interval in intervals
+        for i in range(0, len(symbols), batch_size)
+    ]
 
-    for symbol in symbols:
-        print(f"📦{count}/{len(symbols)} {symbol} 분봉 수집 중...")
-        count += 1
+    with UpsertPipeline(session, ohlcv_today_repo.insert_ohlcv_today_bulk, name="intraday",
+                        size_fn=count_bars) as pipeline, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_latest_intraday_batch, chunk, interval, bar_close): (chunk, interval)
+            for chunk, interval in tasks
+        }
 
-        for interval in intervals:
-            rows = get_ohlcv_from_twelvedata(symbol, interval=interval, limit=1)
-            if not rows:
-                continue
+        count = 1
+        for future in as_completed(futures):
+            chunk, interval = futures[future]
+            print(f"📦{count}/{len(tasks)} {chunk[0]}~{chunk[-1]} ({interval}) {len(chunk)}개 종목 분봉 수집 완료")
+            count += 1
 
-            row = rows[0]
             try:
-                timestamp = datetime.strptime(row["timestamp"], "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                print(f"❌ {symbol} {interval} → timestamp 파싱 실패: {row['timestamp']}")
+                bars = future.result()
+            except Exception as e:
+                print(f"⚠️ {chunk[0]}~{chunk[-1]} ({interval}) 분봉 수집 중 예외 발생: {e}")
                 continue
 
-            all_results.append({
-                "symbol": symbol,
-                "interval": interval,
-                "timestamp": timestamp,
-                "open": row["open"],
-                "high": row["high"],
-                "low": row["low"],
-                "close": row["close"],
-                "volume": row["volume"],
-            })
-
-        time.sleep(sleep_time)
-
-    # ✅ 최종 bulk insert
-    ohlcv_today_repo.insert_ohlcv_today_bulk(session, all_results)
+            pipeline.put(bars)
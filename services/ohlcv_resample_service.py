@@ -0,0 +1,108 @@
+# services/ohlcv_resample_service.py
+
+from sqlalchemy.orm import Session
+from repos import ohlcv_repo
+from models.bar_batch import BarBatch, count_bars
+from utils.dates import next_session
+from datetime import date, timedelta
+import numpy as np
+
+
+def get_period_start(day: date, interval: str) -> date:
+    """
+    해당 날짜가 속한 주(월요일) 또는 월(1일)의 시작일 반환
+    """
+    if interval == "1week":
+        return day - timedelta(days=day.weekday())
+    if interval == "1month":
+        return day.replace(day=1)
+    raise ValueError(f"지원하지 않는 interval: {interval}")
+
+
+def get_period_starts(days, interval: str):
+    """
+    datetime64[D] 배열의 각 날짜가 속한 주(월요일) 또는 월(1일)의 시작일 배열
+    """
+    if interval == "1week":
+        # 1970-01-01은 목요일 → (일수 + 3) % 7 이 월요일 기준 요일 번호
+        offsets = (days.astype(np.int64) + 3) % 7
+        return days - offsets.astype("timedelta64[D]")
+    if interval == "1month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"지원하지 않는 interval: {interval}")
+
+
+def resample_daily_batch(batch: BarBatch, interval: str) -> BarBatch | None:
+    """
+    일봉 BarBatch(날짜 오름차순)를 주봉/월봉 BarBatch로 변환 (주봉은 월요일, 월봉은 1일로 라벨링 - yfinance와 동일)
+    open=first, high=max, low=min, close=last, volume=sum
+    """
+    if not len(batch):
+        return None
+
+    periods = get_period_starts(batch.timestamps, interval)
+    # 정렬된 배열이므로 기간이 바뀌는 위치가 곧 그룹 경계
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:], len(periods)] - 1
+
+    return BarBatch(
+        batch.symbol,
+        interval,
+        periods[starts],
+        batch.open[starts],
+        np.maximum.reduceat(batch.high, starts),
+        np.minimum.reduceat(batch.low, starts),
+        batch.close[ends],
+        np.add.reduceat(batch.volume, starts),
+    )
+
+
+def resample_weekly_monthly(session: Session, touched: dict[str, date], intervals: list[str] = ["1week", "1month"]):
+    """
+    새로 upsert된 일봉이 걸친 주/월만 다시 계산하여 stock_ohlcv에 주봉·월봉으로 저장
+    touched: {symbol: 이번에 upsert된 가장 이른 일봉 날짜}
+    """
+    if not touched:
+        print("⏩ 갱신된 일봉 없음 → 주봉/월봉 재계산 스킵")
+        return
+
+    # 주/월 시작일 중 더 이른 날짜부터 한 번만 조회
+    symbol_since = {
+        symbol: min(get_period_start(day, interval) for interval in intervals)
+        for symbol, day in touched.items()
+    }
+    daily_batches = ohlcv_repo.get_ohlcv_since(session, symbol_since, "1day")
+
+    for interval in intervals:
+        results = []
+        for batch in daily_batches:
+            since = np.datetime64(get_period_start(touched[batch.symbol], interval), "D")
+            start = int(np.searchsorted(batch.timestamps, since))
+            daily = batch.slice(start, len(batch))
+            resampled = resample_daily_batch(daily, interval)
+            if resampled is None:
+                continue
+
+            # 저장된 일봉이 기간 중간부터 시작하면 첫 기간은 일부 bar만으로 계산됨
+            # → 벤더 주봉/월봉을 잘못된 값으로 덮어쓰지 않도록 제외
+            first_session = next_session(resampled.timestamps[0].item(), inclusive=True)
+            if daily.timestamps[0].item() > first_session:
+                resampled = resampled.slice(1, len(resampled))
+            if len(resampled):
+                results.append(resampled)
+
+        ohlcv_repo.insert_ohlcv_bulk(session, results)
+        print(f"✅ 일봉 기반 {interval} {count_bars(results)}개 재계산 upsert 완료 ({len(touched)}개 종목)")
+
+
+def update_touched_days(touched: dict[str, date], batches: list[BarBatch]) -> dict[str, date]:
+    """
+    upsert한 일봉 BarBatch 리스트에서 종목별 가장 이른 날짜를 touched에 반영
+    """
+    for batch in batches:
+        if not len(batch):
+            continue
+        day = batch.earliest_date()
+        if batch.symbol not in touched or day < touched[batch.symbol]:
+            touched[batch.symbol] = day
+    return touched
@@ -1,128 +1,165 @@
 from sqlalchemy.orm import Session
-from collectors.twelvedata_ohlcv_collector import get_ohlcv_from_twelvedata
-from collectors.yfinance_ohlcv_collector import get_ohlcv_from_yfinance
+from collectors.yfinance_ohlcv_collector import get_ohlcv_from_yfinance, get_ohlcv_batch_from_yfinance
 from repos import ohlcv_repo
-from datetime import datetime, timezone, timedelta
+from services.ohlcv_resample_service import update_touched_days
+from services.upsert_pipeline import UpsertPipeline
+from models.bar_batch import count_bars
+from utils.dates import count_sessions, count_weeks, count_months
+from utils.market_calendar import get_market_date
+from datetime import date
 import time
-import math
 
+# 조회 기간을 몇 단계로 묶어 한 번의 배치 요청에 최대한 많은 종목이 들어가도록 함 (겹치는 구간은 upsert 처리)
+LOOKBACK_TIERS = (5, 10, 20, 60, 120)
 
-def collect_ohlcv_daily(session: Session, symbols: list[str], max_limit: int = 250, buffer_days: int = 1):
+INTERVAL_LABELS = {
+    "1day": "일봉",
+    "1week": "주봉",
+    "1month": "월봉",
+}
+
+
+def bucket_lookback(limit: int, max_limit: int) -> int:
     """
-    1일 단위 OHLCV 데이터를 수집하여 stock_ohlcv 테이블에 저장
-    - 최근 저장된 날짜 기준으로 누락 추정하여 수집
-    - buffer_days 만큼 추가하여 겹치는 데이터는 upsert 처리
+    필요한 조회 기간(limit)을 가장 가까운 상위 단계로 올림
     """
-    count = 1
-    all_results = []
-    today_utc = datetime.now(timezone.utc).date()
+    for tier in LOOKBACK_TIERS:
+        if limit <= tier and tier < max_limit:
+            return tier
+    return max_limit
 
-    for symbol in symbols:
-        print(f"📦{count}/{len(symbols)} {symbol} 일봉 데이터 수집 중...")
+
+def iter_ohlcv_batched(symbols_by_limit: dict[int, list[str]], interval: str, chunk_size: int = 100):
+    """
+    조회 기간별로 묶인 종목들을 chunk_size 단위의 yfinance 배치 요청으로 수집
+    - 배치 요청 하나가 끝날 때마다 해당 종목들의 BarBatch 리스트를 yield
+    """
+    for limit, group in sorted(symbols_by_limit.items()):
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:i + chunk_size]
+            print(f"📦 {interval} {limit}개 구간 × {len(chunk)}개 종목 배치 요청 ({i + len(chunk)}/{len(group)})")
+
+            batch = get_ohlcv_batch_from_yfinance(chunk, interval=interval, limit=limit)
+            bars = []
+            for symbol in chunk:
+                symbol_bars = batch.get(symbol)
+                if not symbol_bars:
+                    print(f"❌ {symbol} ({interval}) 배치 결과 없음")
+                    continue
+                bars.append(symbol_bars)
+            yield bars
+
+
+def iter_ohlcv_per_symbol(fetch_limits: dict[str, int], interval: str, sleep_sec: float = 1.0):
+    """
+    종목별로 하나씩 yfinance 요청 (배치 모드를 쓰지 않을 때)
+    """
+    count = 1
+    for symbol, limit in fetch_limits.items():
+        print(f"📦{count}/{len(fetch_limits)} {symbol}: {limit}개 구간 {interval} 데이터 요청")
         count += 1
 
-        latest_timestamp = ohlcv_repo.get_latest_ohlcv_timestamp(session, symbol, "1day")
+        bars = get_ohlcv_from_yfinance(symbol, interval=interval, limit=limit)
+        if bars:
+            yield [bars]
+        time.sleep(sleep_sec)
 
-        if latest_timestamp:
-            delta_days = (today_utc - latest_timestamp).days
-            fetch_days = min(max_limit, delta_days + buffer_days)
-        else:
-            fetch_days = max_limit  # 최초 수집
 
-        print(f"🔍 {symbol}: {fetch_days}일치 데이터 요청 예정")
+def stream_ohlcv(session: Session, fetch_limits: dict[str, int], interval: str, max_limit: int,
+                 batched: bool = True) -> dict[str, date]:
+    """
+    종목별 조회 기간(fetch_limits)대로 수집하면서, 수집된 묶음을 바로 writer 스레드로 넘겨 upsert
+    - 네트워크 수집과 DB 저장이 겹쳐 실행됨
+    Returns: {symbol: upsert된 가장 이른 날짜}
+    """
+    if batched:
+        symbols_by_limit: dict[int, list[str]] = {}
+        for symbol, limit in fetch_limits.items():
+            symbols_by_limit.setdefault(bucket_lookback(limit, max_limit), []).append(symbol)
+        batches = iter_ohlcv_batched(symbols_by_limit, interval)
+    else:
+        batches = iter_ohlcv_per_symbol(fetch_limits, interval)
+
+    touched: dict[str, date] = {}
+    with UpsertPipeline(session, ohlcv_repo.insert_ohlcv_bulk, name=f"ohlcv-{interval}",
+                        size_fn=count_bars) as pipeline:
+        for bars in batches:
+            update_touched_days(touched, bars)
+            pipeline.put(bars)
+
+    print(f"✅ 총 {pipeline.submitted}개의 {INTERVAL_LABELS[interval]} OHLCV 데이터 upsert 처리 완료")
+
+    # 캐시가 DB 전체 구간을 담고 있어야 캐시를 읽는 지표/수익률 계산이 맞으므로 빠진 종목은 재구성
+    try:
+        ohlcv_repo.sync_ohlcv_cache(session, interval, list(fetch_limits))
+    except Exception as e:
+        session.rollback()
+        print(f"⚠️ {INTERVAL_LABELS[interval]} OHLCV 캐시 동기화 실패: {e}")
+    return touched
+
+
+def collect_ohlcv_daily(session: Session, symbols: list[str], max_limit: int = 250, buffer_days: int = 1,
+                        batched: bool = True, watermarks: dict | None = None):
+    """
+    1일 단위 OHLCV 데이터를 수집하여 stock_ohlcv 테이블에 저장
+    - 최근 저장된 날짜 이후의 NYSE 거래일 수만큼 수집 (주말/휴장일은 세지 않음)
+    - buffer_days 만큼 추가하여 겹치는 데이터는 upsert 처리
+    - batched=True면 조회 기간이 같은 종목끼리 묶어 yfinance 배치 요청으로 수집
+    - watermarks: get_latest_ohlcv_timestamps 결과 (없으면 한 번의 쿼리로 조회)
+    Returns: {symbol: upsert된 가장 이른 일봉 날짜} (주봉/월봉 재계산 범위로 사용)
+    """
+    fetch_limits: dict[str, int] = {}
+    today = get_market_date()
+    if watermarks is None:
+        watermarks = ohlcv_repo.get_latest_ohlcv_timestamps(session, ["1day"])
 
-        ohlcv_data = get_ohlcv_from_yfinance(
-            symbol,
-            interval="1day",
-            limit=fetch_days
-        )
+    for symbol in symbols:
+        latest_timestamp = watermarks.get((symbol, "1day"))
 
-        if not ohlcv_data:
-            continue
+        if latest_timestamp:
+            fetch_limits[symbol] = min(max_limit, count_sessions(latest_timestamp, today) + buffer_days)
+        else:
+            fetch_limits[symbol] = max_limit  # 최초 수집
 
-        for row in ohlcv_data:
-            # row["timestamp"] = datetime.strptime(row["timestamp"], "%Y-%m-%d").date()
-            row["interval"] = "1day"
-            row["symbol"] = symbol
+    return stream_ohlcv(session, fetch_limits, "1day", max_limit, batched)
 
-        all_results.extend(ohlcv_data)
-        time.sleep(1.0)
 
-    ohlcv_repo.insert_ohlcv_bulk(session, all_results)
-    print(f"✅ 총 {len(all_results)}개의 일봉 OHLCV 데이터 upsert 완료")
-    
-    
-def collect_ohlcv_weekly(session: Session, symbols: list[str], max_limit: int = 100, buffer_weeks: int = 1):
-    count = 1
-    all_results = []
-    today_utc = datetime.now(timezone.utc).date()
+def collect_ohlcv_weekly(session: Session, symbols: list[str], max_limit: int = 100, buffer_weeks: int = 1,
+                         batched: bool = True, watermarks: dict | None = None):
+    fetch_limits: dict[str, int] = {}
+    today = get_market_date()
+    if watermarks is None:
+        watermarks = ohlcv_repo.get_latest_ohlcv_timestamps(session, ["1week"])
 
     for symbol in symbols:
-        print(f"📦{count}/{len(symbols)} {symbol} 주봉 데이터 수집 중...")
-        count += 1
-
-        latest_timestamp = ohlcv_repo.get_latest_ohlcv_timestamp(session, symbol, "1week")
+        latest_timestamp = watermarks.get((symbol, "1week"))
 
         if latest_timestamp:
-            delta_days = (today_utc - latest_timestamp).days
-            fetch_weeks = min(max_limit, math.ceil(delta_days / 7) + buffer_weeks)
+            fetch_limits[symbol] = min(max_limit, count_weeks(latest_timestamp, today) + buffer_weeks)
         else:
-            fetch_weeks = max_limit  # 처음 수집하는 경우
-
-        print(f"🔍 {symbol}: {fetch_weeks}주치 데이터 요청 예정")
-
-        raw_data = get_ohlcv_from_yfinance(symbol, interval="1week", limit=fetch_weeks)
-        if not raw_data:
-            continue
+            fetch_limits[symbol] = max_limit  # 처음 수집하는 경우
 
-        for row in raw_data:
-            # row["timestamp"] = datetime.strptime(row["timestamp"], "%Y-%m-%d").date()
-            row["interval"] = "1week"
-            row["symbol"] = symbol
+    stream_ohlcv(session, fetch_limits, "1week", max_limit, batched)
 
-        all_results.extend(raw_data)
-        time.sleep(1.0)
 
-    ohlcv_repo.insert_ohlcv_bulk(session, all_results)  # 이때는 upsert 버전 사용
-    print(f"✅ 총 {len(all_results)}개의 주봉 OHLCV 데이터 upsert 완료")
-
-
-    
-def collect_ohlcv_monthly(session: Session, symbols: list[str], max_limit: int = 60, buffer_months: int = 1):
+def collect_ohlcv_monthly(session: Session, symbols: list[str], max_limit: int = 60, buffer_months: int = 1,
+                          batched: bool = True, watermarks: dict | None = None):
     """
     1개월 단위 OHLCV 데이터를 수집하여 stock_ohlcv 테이블에 저장
-    - 최근 저장된 날짜 기준으로 누락 추정하여 수집
+    - 최근 저장된 날짜 이후 거래일이 걸친 달 수만큼 수집
     - buffer_months 만큼 추가하여 겹치는 데이터는 upsert 처리
     """
-    count = 1
-    all_results = []
-    today_utc = datetime.now(timezone.utc).date()
+    fetch_limits: dict[str, int] = {}
+    today = get_market_date()
+    if watermarks is None:
+        watermarks = ohlcv_repo.get_latest_ohlcv_timestamps(session, ["1month"])
 
     for symbol in symbols:
-        print(f"📦{count}/{len(symbols)} {symbol} 월봉 데이터 수집 중...")
-        count += 1
-
-        latest_timestamp = ohlcv_repo.get_latest_ohlcv_timestamp(session, symbol, "1month")
+        latest_timestamp = watermarks.get((symbol, "1month"))
 
         if latest_timestamp:
-            delta_days = (today_utc - latest_timestamp).days
-            fetch_months = min(max_limit, math.ceil(delta_days / 30) + buffer_months)
+            fetch_limits[symbol] = min(max_limit, count_months(latest_timestamp, today) + buffer_months)
         else:
-            fetch_months = max_limit  # 처음 수집하는 경우
-
-        print(f"🔍 {symbol}: {fetch_months}개월치 데이터 요청 예정")
-
-        raw_data = get_ohlcv_from_yfinance(symbol, interval="1month", limit=fetch_months)
-        if not raw_data:
-            continue
-
-        for row in raw_data:
-            # row["timestamp"] = datetime.strptime(row["timestamp"], "%Y-%m-%d").date()
-            row["interval"] = "1month"
-            row["symbol"] = symbol
-
-        all_results.extend(raw_data)
-        time.sleep(1.0)
+            fetch_limits[symbol] = max_limit  # 처음 수집하는 경우
 
-    ohlcv_repo.insert_ohlcv_bulk(session, all_results)
-    print(f"✅ 총 {len(all_results)}개의 월봉 OHLCV 데이터 upsert 완료")
+    stream_ohlcv(session, fetch_limits, "1month", max_limit, batched)
@@ -0,0 +1,82 @@
+# services/panel.py
+
+"""
+종목별 일봉을 (종목 × 날짜) NumPy 패널로 다루는 공통 도구
+- 지표/기간 수익률/섹터 수익률 계산이 함께 사용
+- 일봉은 로컬 OHLCV 캐시에서 먼저 읽고, 캐시가 구간을 덮지 못하는 종목만 DB에서 조회
+"""
+
+from sqlalchemy.orm import Session
+from repos import ohlcv_cache, ohlcv_repo
+from models.bar_batch import BarBatch
+from datetime import date
+import numpy as np
+
+
+def load_history(session: Session, symbols: list[str], interval: str,
+                 since: date | dict[str, date | None] | None) -> dict[str, BarBatch]:
+    """
+    로컬 OHLCV 캐시에서 먼저 읽고, 캐시가 요청 구간을 다 담고 있지 않은 종목만 DB에서 조회
+    - since: 전 종목 공통 시작일 또는 {symbol: 시작일} (None이면 전체 구간)
+    - 캐시의 첫 bar가 max(시작일, DB 첫 bar)보다 늦으면 잘린 캐시로 보고 DB 사용
+    """
+    symbol_since = since if isinstance(since, dict) else {symbol: since for symbol in symbols}
+    targets = symbols
+    batches = {}
+
+    if ohlcv_cache.OHLCV_CACHE_ENABLED:
+        db_first = ohlcv_repo.get_first_ohlcv_timestamps(session, symbols, interval)
+        cache_first = ohlcv_cache.get_first_timestamps(interval, list(db_first))
+        targets = []
+        for symbol, first in db_first.items():
+            start = symbol_since.get(symbol)
+            if symbol in cache_first and cache_first[symbol] <= max(start or first, first):
+                batch = ohlcv_cache.read_bars(symbol, interval, start=start)
+                if len(batch):
+                    batches[symbol] = batch
+            else:
+                targets.append(symbol)
+
+    if targets:
+        for batch in ohlcv_repo.get_ohlcv_since(
+            session, {symbol: symbol_since.get(symbol) or date(1900, 1, 1) for symbol in targets}, interval,
+        ):
+            batches[batch.symbol] = batch
+        print(f"📂 캐시가 구간을 덮지 못하는 {len(targets)}개 종목은 DB에서 조회")
+
+    return batches
+
+
+def build_panel(batches: dict[str, BarBatch]) -> tuple[list[str], np.ndarray, dict[str, np.ndarray]]:
+    """
+    종목별 BarBatch를 (종목 × 날짜) 패널로 정렬
+    - 날짜 축은 전 종목 날짜의 합집합, bar가 없는 칸은 NaN
+    Returns: (symbols, dates(datetime64[D]), {"high"|"low"|"close": 2차원 배열})
+    """
+    symbols = list(batches)
+    dates = np.unique(np.concatenate([batch.timestamps.astype("datetime64[D]") for batch in batches.values()]))
+
+    shape = (len(symbols), len(dates))
+    panel = {field: np.full(shape, np.nan) for field in ("high", "low", "close")}
+    for i, symbol in enumerate(symbols):
+        batch = batches[symbol]
+        columns = np.searchsorted(dates, batch.timestamps.astype("datetime64[D]"))
+        for field, values in panel.items():
+            values[i, columns] = getattr(batch, field)
+
+    return symbols, dates, panel
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """
+    행(종목)별로 NaN 칸을 직전 값으로 채움 (첫 값 이전의 NaN은 유지)
+    """
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    return values[np.arange(values.shape[0])[:, None], index]
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    out[:, periods:] = values[:, :-periods]
+    return out
@@ -0,0 +1,103 @@
+# services/return_service.py
+
+"""
+전 종목 + 주요 지수의 기간 수익률(1W, 1M~12M, YTD) 행렬 계산
+- 종목 × 날짜 종가 패널을 직전 값으로 채운 뒤, 기간별 기준일을 searchsorted로 한 번에 as-of 조회
+- 월 단위 기간은 N개월 전 달의 마지막 거래일 종가 대비
+- YTD는 전년도 마지막 거래일 종가 대비
+"""
+
+from sqlalchemy.orm import Session
+from collectors.yfinance_ohlcv_collector import get_ohlcv_batch_from_yfinance
+from repos import return_repo
+from repos.return_repo import RETURN_HORIZONS
+from services.panel import load_history, build_panel, forward_fill
+from datetime import date, timedelta
+import numpy as np
+
+INDEX_SYMBOLS = ["^GSPC", "^IXIC", "^DJI", "^RUT"]
+
+# 기준일 직전 이 기간 안에 종가가 없으면 (거래정지/상장폐지 등) 저장하지 않음
+STALE_DAYS = 7
+
+
+def get_horizon_targets(as_of: date) -> np.ndarray:
+    """
+    RETURN_HORIZONS 순서대로 과거 비교 기준일(이 날짜까지의 마지막 종가를 사용) 배열
+    """
+    base = np.datetime64(as_of, "D")
+    month = base.astype("datetime64[M]")
+    targets = [base - np.timedelta64(7, "D")]  # 1W
+    for i in range(1, 13):
+        # N개월 전 달의 말일
+        targets.append(((month - i) + 1).astype("datetime64[D]") - 1)
+    targets.append(np.datetime64(date(as_of.year - 1, 12, 31), "D"))  # YTD
+    return np.array(targets, dtype="datetime64[D]")
+
+
+def compute_return_matrix(dates: np.ndarray, close: np.ndarray, as_of: date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (종목 × 날짜) 종가 패널에서 (종목 × 기간) 수익률(%) 행렬 계산
+    Returns: (수익률 행렬, 종목별 기준 종가일)
+    """
+    filled = forward_fill(close)
+    if np.datetime64(as_of, "D") < dates[0]:
+        raise ValueError(f"기준일 {as_of} 이전 종가가 없음")
+
+    # 각 날짜 기준 "그날까지의 마지막 종가"가 있는 컬럼 위치 (없으면 -1)
+    targets = np.concatenate([[np.datetime64(as_of, "D")], get_horizon_targets(as_of)])
+    columns = np.searchsorted(dates, targets, side="right") - 1
+
+    prices = np.where(columns >= 0, filled[:, np.maximum(columns, 0)], np.nan)
+    current, past = prices[:, :1], prices[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (current / past - 1) * 100
+
+    # 종목별 실제 마지막 종가일 (as_of 이전)
+    has_bar = ~np.isnan(close[:, :columns[0] + 1])
+    last_column = has_bar.shape[1] - 1 - np.argmax(has_bar[:, ::-1], axis=1)
+    last_dates = np.where(has_bar.any(axis=1), dates[last_column], np.datetime64("NaT"))
+    return returns, last_dates
+
+
+def collect_return_matrix(session: Session, symbols: list[str], as_of: date | None = None,
+                          include_indices: bool = True):
+    """
+    종목(저장된 일봉) + 지수(yfinance 배치 1회)의 기간 수익률을 계산하여 stock_return에 저장
+    as_of가 없으면 패널의 마지막 거래일 기준
+    """
+    return_repo.ensure_return_table(session)
+
+    # YTD와 12M 기준일을 모두 덮도록 조회 시작일 결정
+    reference = as_of or date.today()
+    since = min(date(reference.year - 1, 12, 1), reference.replace(day=1) - timedelta(days=400))
+    batches = load_history(session, symbols, "1day", since)
+
+    if include_indices:
+        limit = (reference - since).days + 10
+        for symbol, batch in get_ohlcv_batch_from_yfinance(INDEX_SYMBOLS, "1day", limit=limit).items():
+            if batch is None:
+                print(f"⚠️ 지수 {symbol} 일봉 수집 실패 → 수익률 제외")
+                continue
+            batches[symbol] = batch
+
+    if not batches:
+        print("⏩ 수익률을 계산할 종가 없음 → 스킵")
+        return
+
+    panel_symbols, dates, panel = build_panel(batches)
+    if as_of is None:
+        as_of = dates[-1].item()
+
+    returns, last_dates = compute_return_matrix(dates, panel["close"], as_of)
+    fresh = last_dates >= np.datetime64(as_of - timedelta(days=STALE_DAYS), "D")
+
+    rows = []
+    for i in np.flatnonzero(fresh):
+        row = {"symbol": panel_symbols[i], "timestamp": as_of}
+        for horizon, value in zip(RETURN_HORIZONS, returns[i].tolist()):
+            row[f"return{horizon}"] = None if value != value else round(value, 4)  # NaN → NULL
+        rows.append(row)
+
+    return_repo.insert_returns_bulk(session, rows)
+    print(f"✅ {as_of} 기준 기간 수익률 {len(rows)}개 종목/지수 저장 ({len(panel_symbols) - len(rows)}개 제외)")
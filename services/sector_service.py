@@ -2,17 +2,139 @@
 
 from sqlalchemy.orm import Session
 from collectors import fmp_financial_sector_collector
+from repos import stock_repo, financial_repo, sector_repo
 from repos.sector_repo import insert_sector_performance
+from services.panel import load_history, build_panel
+from utils.dates import previous_session
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+import os
 
+# 저장된 섹터 수익률이 없을 때 처음 채우는 기간
+BACKFILL_DAYS = int(os.getenv("SECTOR_BACKFILL_DAYS", 365))
+# "cap"(시가총액 가중) 또는 "equal"(동일 가중)
+SECTOR_WEIGHTING = os.getenv("SECTOR_RETURN_WEIGHTING", "cap")
+# FMP sectors-performance와 비교 (키 1회 사용, 실패해도 저장에는 영향 없음)
+SECTOR_FMP_CROSS_CHECK = os.getenv("SECTOR_FMP_CROSS_CHECK", "false").lower() in ("1", "true", "yes")
 
-def collect_sector_performance(session: Session):
+
+def compute_sector_returns(session: Session, start: date, end: date | None = None,
+                           weighting: str = SECTOR_WEIGHTING) -> list[dict]:
     """
-    Alpha Vantage를 통해 섹터별 수익률을 수집하고 저장
+    저장된 일봉 종가로 섹터별 일간 수익률(%)을 계산
+    - 종목 × 날짜 수익률 패널을 섹터 one-hot 행렬과 곱해 한 번에 groupby
+    - weighting="equal": 해당 날 수익률이 있는 종목의 단순 평균
+    - weighting="cap": 전일 시가총액 가중 평균
+      (최근 재무정보의 marketCap과 최근 종가로 주식 수를 추정해 날짜별 시가총액 = 주식 수 × 종가)
+      marketCap이 있는 종목이 하나도 없는 섹터는 동일 가중, 나머지 섹터에서 marketCap이 없는 종목은 제외(건수 출력)
+    Returns: [{"date", "sector", "return"}, ...]
     """
-    data = fmp_financial_sector_collector.fetch_sector_performance_from_fmp()
+    if weighting not in ("cap", "equal"):
+        raise ValueError(f"지원하지 않는 weighting: {weighting}")
+
+    sectors = stock_repo.get_symbol_sectors(session)
+    # 시작일의 전 거래일 종가부터 필요
+    batches = load_history(session, list(sectors), "1day", previous_session(start))
+    if not batches:
+        return []
+
+    symbols, dates, panel = build_panel(batches)
+    close = panel["close"]
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    returns = close / prev_close - 1  # 어느 한쪽이 없으면 NaN
+
+    sector_names, sector_index = np.unique([sectors[symbol] for symbol in symbols], return_inverse=True)
+    one_hot = np.zeros((len(sector_names), len(symbols)))
+    one_hot[sector_index, np.arange(len(symbols))] = 1.0
+
+    if weighting == "cap":
+        market_caps = financial_repo.get_latest_market_caps(session)
+        last_close = np.array([batches[symbol].close[-1] for symbol in symbols])
+        caps = np.array([market_caps.get(symbol, np.nan) for symbol in symbols])
+        shares = caps / last_close
+        has_cap = ~np.isnan(shares)
+
+        # 재무 데이터가 아직 없는 섹터(FMP 미수집 등)는 동일 가중으로 계산
+        equal_sector = (one_hot @ has_cap) == 0
+        use_equal = equal_sector[sector_index]
+        weights = np.where(use_equal[:, None], 1.0, shares[:, None] * prev_close)
+
+        if equal_sector.any():
+            print(f"⚠️ marketCap이 없는 섹터 {int(equal_sector.sum())}개는 동일 가중: {', '.join(sector_names[equal_sector].tolist())}")
+        excluded = int((~has_cap & ~use_equal).sum())
+        if excluded:
+            print(f"⚠️ marketCap이 없는 {excluded}개 종목은 시가총액 가중 섹터 수익률에서 제외")
+    else:
+        weights = np.ones(close.shape)
+
+    valid = ~np.isnan(returns) & ~np.isnan(weights)
+    weights = np.where(valid, weights, 0.0)
+
+    weighted = one_hot @ np.where(valid, weights * returns, 0.0)
+    total_weight = one_hot @ weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sector_returns = weighted / total_weight * 100
+
+    end = end or datetime.now(timezone.utc).date()
+    in_range = (dates >= np.datetime64(start, "D")) & (dates <= np.datetime64(end, "D"))
+
+    day_list = dates.tolist()
+    results = []
+    for column in np.flatnonzero(in_range):
+        for i, sector in enumerate(sector_names.tolist()):
+            if total_weight[i, column] > 0:
+                results.append({
+                    "date": day_list[column],
+                    "sector": sector,
+                    "return": round(float(sector_returns[i, column]), 4),
+                })
+    return results
+
+
+def cross_check_with_fmp(results: list[dict]) -> None:
+    """
+    로컬 계산값 중 가장 최근 날짜를 FMP sectors-performance와 비교하여 차이만 출력
+    """
+    if not results:
+        return
+
+    fmp_data = fmp_financial_sector_collector.fetch_sector_performance_from_fmp()
+    if not fmp_data:
+        print("⚠️ FMP 섹터 수익률 비교 스킵: 응답 없음")
+        return
+
+    latest = max(row["date"] for row in results)
+    local = {row["sector"]: row["return"] for row in results if row["date"] == latest}
+    for item in fmp_data:
+        if item["sector"] in local:
+            diff = local[item["sector"]] - item["return"]
+            print(f"🔎 {item['sector']}: 로컬 {local[item['sector']]:.2f}% / FMP {item['return']:.2f}% (차이 {diff:+.2f}%p)")
+
+
+def collect_sector_performance(session: Session, start: date | None = None, end: date | None = None,
+                               weighting: str = SECTOR_WEIGHTING, cross_check: bool = SECTOR_FMP_CROSS_CHECK):
+    """
+    저장된 일봉으로 섹터별 수익률을 로컬 계산하여 sector_performance에 저장
+    - start가 없으면 마지막 저장일부터 (저장된 값이 없으면 BACKFILL_DAYS 전부터) 빈 기간을 채움
+      (마지막 저장일도 장중 값이었을 수 있으므로 다시 계산)
+    - cross_check=True면 FMP 값과 비교 출력 (선택)
+    """
+    if start is None:
+        latest = sector_repo.get_latest_sector_date(session)
+        today = datetime.now(timezone.utc).date()
+        start = latest if latest else today - timedelta(days=BACKFILL_DAYS)
+
+    data = compute_sector_returns(session, start, end, weighting)
     if not data:
-        print("❌ 수익률 수집 실패: 빈 데이터")
+        print("⏩ 새로 계산할 섹터 수익률 없음")
         return
 
     insert_sector_performance(session, data)
-    print("✅ 섹터 수익률 저장 완료")
+    print(f"✅ 섹터 수익률 저장 완료 ({weighting}, {len({row['date'] for row in data})}일)")
+
+    if cross_check:
+        try:
+            cross_check_with_fmp(data)
+        except Exception as e:
+            print(f"⚠️ FMP 섹터 수익률 비교 실패: {e}")
@@ -0,0 +1,143 @@
+# services/stage_graph.py
+
+"""
+배치 단계(stage)를 의존성 그래프로 실행
+- 의존 단계가 모두 성공한 단계부터 스레드 풀에서 동시에 실행
+- 단계마다 자체 세션을 열고, 실패하면 rollback 후 retries 횟수만큼 재시도
+- 실패한 단계에 (직간접적으로) 의존하는 단계만 건너뛰고 나머지는 계속 진행
+- 단계 함수는 fn(session, results) 형태이며 results는 {단계 이름: 반환값}
+"""
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from db import SessionLocal
+
+
+class Stage:
+    def __init__(self, name: str, fn, deps: list[str] | None = None, retries: int = 0,
+                 retry_delay_sec: float = 30.0):
+        self.name = name
+        self.fn = fn
+        self.deps = deps or []
+        self.retries = retries
+        self.retry_delay_sec = retry_delay_sec
+
+
+class StageReport:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"  # pending → running → success | failed | skipped
+        self.attempts = 0
+        self.elapsed_sec = 0.0
+        self.error: str | None = None
+
+
+def run_stage(stage: Stage, results: dict, report: StageReport):
+    """
+    단계 하나를 자체 세션으로 실행 (실패 시 재시도)
+    """
+    started = time.perf_counter()
+    try:
+        while True:
+            report.attempts += 1
+            session = SessionLocal()
+            try:
+                return stage.fn(session, results)
+            except Exception as e:
+                session.rollback()
+                report.error = f"{type(e).__name__}: {e}"
+                if report.attempts > stage.retries:
+                    raise
+                print(f"⚠️ [{stage.name}] {report.attempts}회차 실패 → {stage.retry_delay_sec:.0f}초 후 재시도: {e}")
+                time.sleep(stage.retry_delay_sec)
+            finally:
+                session.close()
+    finally:
+        report.elapsed_sec = time.perf_counter() - started
+
+
+def validate_stages(stages: list[Stage]) -> None:
+    """
+    이름 중복, 없는 의존 단계, 순환 의존 검사
+    """
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"단계 이름 중복: {names}")
+
+    deps = {stage.name: stage.deps for stage in stages}
+    for name, stage_deps in deps.items():
+        missing = [dep for dep in stage_deps if dep not in deps]
+        if missing:
+            raise ValueError(f"[{name}] 존재하지 않는 의존 단계: {missing}")
+
+    visited, visiting = set(), set()
+
+    def visit(name: str):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"순환 의존: {name}")
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep)
+        visiting.remove(name)
+        visited.add(name)
+
+    for name in deps:
+        visit(name)
+
+
+def run_stage_graph(stages: list[Stage], max_workers: int = 4) -> dict[str, StageReport]:
+    """
+    단계 그래프 실행 후 단계별 결과(상태/시도 횟수/소요 시간) 반환
+    """
+    validate_stages(stages)
+    by_name = {stage.name: stage for stage in stages}
+    reports = {stage.name: StageReport(stage.name) for stage in stages}
+    results: dict = {}
+    started = time.perf_counter()
+
+    def skip_dependents(failed: str):
+        for stage in stages:
+            report = reports[stage.name]
+            if report.status == "pending" and failed in stage.deps:
+                report.status = "skipped"
+                report.error = f"의존 단계 실패: {failed}"
+                print(f"⏩ [{stage.name}] 의존 단계 {failed} 실패 → 건너뜀")
+                skip_dependents(stage.name)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as executor:
+        running = {}
+        while True:
+            for stage in stages:
+                report = reports[stage.name]
+                if report.status == "pending" and all(reports[dep].status == "success" for dep in stage.deps):
+                    report.status = "running"
+                    print(f"▶️ [{stage.name}] 시작")
+                    running[executor.submit(run_stage, stage, results, report)] = stage.name
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                report = reports[name]
+                try:
+                    results[name] = future.result()
+                    report.status = "success"
+                    print(f"✅ [{name}] 완료 ({report.elapsed_sec:.1f}초)")
+                except Exception as e:
+                    report.status = "failed"
+                    print(f"❌ [{name}] 실패 ({report.attempts}회 시도, {report.elapsed_sec:.1f}초): {e}")
+                    traceback.print_exc()
+                    skip_dependents(name)
+
+    total_sec = time.perf_counter() - started
+    print(f"📊 배치 단계별 결과 (전체 {total_sec:.1f}초, 단계 합계 {sum(r.elapsed_sec for r in reports.values()):.1f}초)")
+    for name in by_name:
+        report = reports[name]
+        print(f"   - {name:<16} {report.status:<8} {report.elapsed_sec:8.1f}초  시도 {report.attempts}회"
+              + (f"  ({report.error})" if report.status != "success" and report.error else ""))
+    return reports
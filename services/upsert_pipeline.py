@@ -0,0 +1,117 @@
+# services/upsert_pipeline.py
+
+"""
+수집(fetch)과 DB 저장(write)을 겹쳐 실행하는 producer/consumer 파이프라인
+- 수집 측은 종목별 row 묶음을 put (큐가 가득 차면 대기 → backpressure)
+- writer 스레드가 큐를 비우면서 row를 모아 write_fn(session, rows)로 저장
+- 파이프라인이 동작하는 동안 session은 writer 스레드만 사용해야 함
+- size_fn: 묶음 하나의 건수 계산 (BarBatch 리스트는 models.bar_batch.count_bars)
+- flush_on_idle=True면 큐가 비는 순간에도 저장 (수집이 빠른 OHLCV용: 지연 최소화)
+  False면 flush_rows개가 모이거나 종료될 때만 저장 (수집이 느린 재무 데이터용: commit 횟수 최소화)
+- submitted: write_fn이 예외 없이 처리한 건수 (write_fn이 건너뛴 row도 포함되므로 실제 저장 건수와 다를 수 있음)
+"""
+
+import queue
+import threading
+import time
+from sqlalchemy.orm import Session
+
+_STOP = object()
+
+
+class UpsertPipeline:
+    def __init__(self, session: Session, write_fn, name: str = "upsert", max_pending: int = 32,
+                 flush_rows: int = 5000, size_fn=len, flush_on_idle: bool = True):
+        self.session = session
+        self.write_fn = write_fn
+        self.size_fn = size_fn
+        self.name = name
+        self.flush_rows = flush_rows
+        self.flush_on_idle = flush_on_idle
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, name=f"{name}-writer", daemon=True)
+        self.error: BaseException | None = None
+        self.received = 0
+        self.submitted = 0
+        self.write_sec = 0.0
+
+    def __enter__(self) -> "UpsertPipeline":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+        if exc_type is None and self.error is not None:
+            raise self.error
+
+    def put(self, rows: list) -> None:
+        """
+        row 묶음을 writer에 전달 (writer가 실패했으면 즉시 예외)
+        """
+        if self.error is not None:
+            raise self.error
+        if not rows:
+            return
+        self.received += self.size_fn(rows)
+        while True:
+            try:
+                self.queue.put(rows, timeout=1.0)
+                return
+            except queue.Full:
+                if self.error is not None:
+                    raise self.error
+
+    def close(self) -> None:
+        """
+        남은 row를 모두 저장하고 writer 스레드 종료를 기다림
+        """
+        if not self.thread.is_alive():
+            return
+        while self.thread.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=1.0)
+                break
+            except queue.Full:
+                continue
+        self.thread.join()
+        print(
+            f"💾 [{self.name}] 파이프라인 종료: {self.submitted}/{self.received}건 저장 처리 "
+            f"(DB 쓰기 {self.write_sec:.1f}초)"
+        )
+
+    def _flush(self, pending: list, size: int) -> None:
+        started = time.perf_counter()
+        self.write_fn(self.session, pending)
+        self.write_sec += time.perf_counter() - started
+        self.submitted += size
+
+    def _run(self) -> None:
+        pending = []
+        pending_size = 0
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            if self.error is not None:
+                continue  # 실패 이후에는 큐만 비워 수집 측이 막히지 않도록 함
+
+            pending.extend(item)
+            pending_size += self.size_fn(item)
+            # 충분히 모였거나, flush_on_idle이면 더 기다리는 묶음이 없을 때 저장
+            if pending_size >= self.flush_rows or (self.flush_on_idle and self.queue.empty()):
+                try:
+                    self._flush(pending, pending_size)
+                except BaseException as e:
+                    print(f"❌ [{self.name}] 저장 실패: {e}")
+                    self.error = e
+                    self.session.rollback()
+                pending = []
+                pending_size = 0
+
+        if pending and self.error is None:
+            try:
+                self._flush(pending, pending_size)
+            except BaseException as e:
+                print(f"❌ [{self.name}] 저장 실패: {e}")
+                self.error = e
+                self.session.rollback()
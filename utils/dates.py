@@ -1,16 +1,140 @@
 # utils/dates.py
-from datetime import date, timedelta
+from datetime import date
+from functools import lru_cache
+import numpy as np
+from utils.market_calendar import is_trading_day
 
-def get_last_business_day_of_month(target_date: date) -> date:
+# 미리 계산해 두는 NYSE 거래일 범위 (끝 연도는 호출 시점의 올해 + SESSION_LOOKAHEAD_YEARS)
+SESSION_START_YEAR = 1990
+SESSION_LOOKAHEAD_YEARS = 5
+
+
+def get_session_end_year() -> int:
+    return date.today().year + SESSION_LOOKAHEAD_YEARS
+
+
+@lru_cache(maxsize=2)
+def build_sessions(end_year: int) -> np.ndarray:
+    days = np.arange(
+        np.datetime64(f"{SESSION_START_YEAR}-01-01"),
+        np.datetime64(f"{end_year + 1}-01-01"),
+        dtype="datetime64[D]",
+    )
+    weekdays = days[(days.astype(np.int64) + 3) % 7 < 5]  # 1970-01-01은 목요일 → 0=월요일
+    return np.array([day for day in weekdays.tolist() if is_trading_day(day)], dtype="datetime64[D]")
+
+
+def get_sessions() -> np.ndarray:
+    """
+    SESSION_START_YEAR ~ (올해 + SESSION_LOOKAHEAD_YEARS)의 NYSE 거래일 정렬 배열 (datetime64[D])
+    - 장기 실행 프로세스에서도 연도가 바뀌면 범위가 늘어난 배열로 다시 계산
+    """
+    return build_sessions(get_session_end_year())
+
+
+def _to_day(day: date) -> np.datetime64:
+    end_year = get_session_end_year()
+    if not SESSION_START_YEAR <= day.year <= end_year:
+        raise ValueError(f"{day}는 거래일 캘린더 범위({SESSION_START_YEAR}~{end_year}) 밖")
+    return np.datetime64(day, "D")
+
+
+def _session_at(sessions: np.ndarray, i: int, day: date) -> date:
+    """
+    범위를 벗어난 위치는 잘라내지 않고 _to_day와 같은 ValueError
+    """
+    if not 0 <= i < len(sessions):
+        raise ValueError(f"{day} 기준 거래일이 캘린더 범위({sessions[0]}~{sessions[-1]}) 밖")
+    return sessions[i].item()
+
+
+def is_session(day: date) -> bool:
+    sessions = get_sessions()
+    i = int(np.searchsorted(sessions, _to_day(day)))
+    return i < len(sessions) and sessions[i] == np.datetime64(day, "D")
+
+
+def next_session(day: date, inclusive: bool = False) -> date:
+    """
+    day 다음 거래일 (inclusive=True면 day가 거래일일 때 day)
+    """
+    sessions = get_sessions()
+    i = int(np.searchsorted(sessions, _to_day(day), side="left" if inclusive else "right"))
+    return _session_at(sessions, i, day)
+
+
+def previous_session(day: date, inclusive: bool = False) -> date:
+    """
+    day 이전 거래일 (inclusive=True면 day가 거래일일 때 day)
+    """
+    sessions = get_sessions()
+    i = int(np.searchsorted(sessions, _to_day(day), side="right" if inclusive else "left")) - 1
+    return _session_at(sessions, i, day)
+
+
+def session_offset(day: date, n: int) -> date:
     """
-    주어진 날짜가 포함된 달의 마지막 영업일을 반환
+    day 기준 n거래일 뒤(n<0이면 앞) 거래일 (day가 휴장일이면 직전 거래일 기준)
     """
-    # 다음 달 1일 - 하루 = 말일
-    next_month = target_date.replace(day=28) + timedelta(days=4)
-    last_day = next_month - timedelta(days=next_month.day)
+    sessions = get_sessions()
+    i = int(np.searchsorted(sessions, _to_day(day), side="right")) - 1
+    if i < 0:
+        raise ValueError(f"{day} 이전 거래일이 캘린더 범위 밖")
+    return _session_at(sessions, i + n, day)
 
-    # 주말이면 금요일로 당기기
-    while last_day.weekday() >= 5:  # 5 = 토, 6 = 일
-        last_day -= timedelta(days=1)
 
-    return last_day
+def get_sessions_between(start: date, end: date) -> np.ndarray:
+    """
+    start 초과 ~ end 이하의 거래일 배열
+    """
+    sessions = get_sessions()
+    lo = np.searchsorted(sessions, _to_day(start), side="right")
+    hi = np.searchsorted(sessions, _to_day(end), side="right")
+    return sessions[lo:hi]
+
+
+def count_sessions(start: date, end: date) -> int:
+    """
+    start 이후(start 제외) end까지(end 포함) 거래일 수
+    """
+    return len(get_sessions_between(start, end))
+
+
+def count_weeks(start: date, end: date) -> int:
+    """
+    start 이후 end까지의 거래일이 걸친 주(월~일) 수
+    """
+    sessions = get_sessions_between(start, end)
+    return len(np.unique((sessions.astype(np.int64) + 3) // 7))
+
+
+def count_months(start: date, end: date) -> int:
+    """
+    start 이후 end까지의 거래일이 걸친 달 수
+    """
+    sessions = get_sessions_between(start, end)
+    return len(np.unique(sessions.astype("datetime64[M]")))
+
+
+def last_session_of_week(target_date: date) -> date:
+    """
+    주어진 날짜가 포함된 주(월~일)의 마지막 거래일 (그 주에 거래일이 없으면 직전 거래일)
+    """
+    sunday = np.datetime64(target_date, "D") + (6 - target_date.weekday())
+    return previous_session(sunday.item(), inclusive=True)
+
+
+def last_session_of_month(target_date: date) -> date:
+    """
+    주어진 날짜가 포함된 달의 마지막 거래일
+    """
+    month = np.datetime64(target_date, "M")
+    month_end = (month + 1).astype("datetime64[D]") - 1
+    return previous_session(month_end.item(), inclusive=True)
+
+
+def get_last_business_day_of_month(target_date: date) -> date:
+    """
+    주어진 날짜가 포함된 달의 마지막 영업일을 반환 (주말 + NYSE 휴장일 제외)
+    """
+    return last_session_of_month(target_date)
@@ -0,0 +1,220 @@
+# utils/market_calendar.py
+
+"""
+NYSE 거래 캘린더 (휴장일, 조기 폐장, 서머타임은 America/New_York 기준으로 처리)
+- 정규장 09:30~16:00 ET, 조기 폐장일은 13:00 ET
+- 프리마켓 04:00~09:30, 애프터마켓 폐장~20:00 ET
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+PRE_MARKET_OPEN = time(4, 0)
+AFTER_MARKET_CLOSE = time(20, 0)
+
+# 규칙으로 계산되지 않는 임시 휴장 (국장, 재해 등) - utils.dates 거래일 범위(1990년~) 전체
+SPECIAL_CLOSURES = {
+    date(1994, 4, 27): "National Day of Mourning (Richard Nixon)",
+    date(2001, 9, 11): "September 11 Attacks",
+    date(2001, 9, 12): "September 11 Attacks",
+    date(2001, 9, 13): "September 11 Attacks",
+    date(2001, 9, 14): "September 11 Attacks",
+    date(2004, 6, 11): "National Day of Mourning (Ronald Reagan)",
+    date(2007, 1, 2): "National Day of Mourning (Gerald Ford)",
+    date(2012, 10, 29): "Hurricane Sandy",
+    date(2012, 10, 30): "Hurricane Sandy",
+    date(2018, 12, 5): "National Day of Mourning (George H.W. Bush)",
+    date(2025, 1, 9): "National Day of Mourning (Jimmy Carter)",
+}
+
+
+def get_easter(year: int) -> date:
+    """
+    부활절 날짜 (그레고리력, Anonymous Gregorian algorithm)
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def get_nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    해당 월의 n번째 weekday (n=-1이면 마지막)
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month, 28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def get_observed(day: date) -> date:
+    """
+    토요일 휴일은 금요일, 일요일 휴일은 월요일에 휴장
+    """
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def get_nyse_holidays(year: int) -> dict[date, str]:
+    """
+    해당 연도의 NYSE 휴장일 {날짜: 이름}
+    """
+    holidays = {}
+
+    # 신정이 토요일이면 전년도 12/31(금)에 휴장하지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[get_observed(new_year)] = "New Year's Day"
+
+    if year >= 1998:  # NYSE는 1998년부터 휴장
+        holidays[get_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    holidays[get_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    holidays[get_easter(year) - timedelta(days=2)] = "Good Friday"
+    holidays[get_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        holidays[get_observed(date(year, 6, 19))] = "Juneteenth"
+    holidays[get_observed(date(year, 7, 4))] = "Independence Day"
+    holidays[get_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    holidays[get_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    holidays[get_observed(date(year, 12, 25))] = "Christmas Day"
+
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            holidays[day] = name
+
+    return holidays
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in get_nyse_holidays(day.year)
+
+
+def is_early_close(day: date) -> bool:
+    """
+    13:00 ET 조기 폐장일 여부
+    - 독립기념일 전날(7/3, 월~목), 추수감사절 다음 날, 크리스마스 이브(평일)
+    """
+    if not is_trading_day(day):
+        return False
+    if day.month == 7 and day.day == 3 and day.weekday() < 4:
+        return True
+    if day.month == 11 and day == get_nth_weekday(day.year, 11, 3, 4) + timedelta(days=1):
+        return True
+    if day.month == 12 and day.day == 24:
+        return True
+    return False
+
+
+def get_session(day: date) -> tuple[datetime, datetime] | None:
+    """
+    해당 날짜의 정규장 (개장, 폐장) 시각 (ET, timezone-aware) - 휴장일이면 None
+    """
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE if is_early_close(day) else REGULAR_CLOSE
+    return (
+        datetime.combine(day, REGULAR_OPEN, tzinfo=MARKET_TZ),
+        datetime.combine(day, close, tzinfo=MARKET_TZ),
+    )
+
+
+def get_market_date(now: datetime | None = None) -> date:
+    """
+    뉴욕 현지 기준 날짜
+    """
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(MARKET_TZ).date()
+
+
+def get_market_status(now: datetime | None = None) -> str:
+    """
+    미국 주식 시장 상태 (휴장일/조기 폐장/서머타임 반영)
+    Returns: 'pre', 'regular', 'after', or 'closed'
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+    session = get_session(now.date())
+    if session is None:
+        return "closed"
+
+    open_, close = session
+    if datetime.combine(now.date(), PRE_MARKET_OPEN, tzinfo=MARKET_TZ) <= now < open_:
+        return "pre"
+    if open_ <= now < close:
+        return "regular"
+    if close <= now < datetime.combine(now.date(), AFTER_MARKET_CLOSE, tzinfo=MARKET_TZ):
+        return "after"
+    return "closed"
+
+
+def next_trading_day(day: date) -> date:
+    """
+    day 다음(당일 제외) 거래일
+    """
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def get_bar_closes(day: date, bar_minutes: int = 60) -> list[datetime]:
+    """
+    정규장 개장(09:30) 기준 bar_minutes 단위 bar들이 끝나는 시각 목록 (마지막 bar는 폐장 시각에 끝남)
+    예) 1시간 봉: 10:30, 11:30, ..., 15:30, 16:00
+    """
+    session = get_session(day)
+    if session is None:
+        return []
+
+    open_, close = session
+    step = timedelta(minutes=bar_minutes)
+    closes = []
+    boundary = open_ + step
+    while boundary < close:
+        closes.append(boundary)
+        boundary += step
+    closes.append(close)
+    return closes
+
+
+def next_bar_close(now: datetime, bar_minutes: int = 60) -> datetime:
+    """
+    now 이후 처음으로 끝나는 정규장 bar 시각 (휴장일은 건너뜀)
+    """
+    day = get_market_date(now)
+    if not is_trading_day(day):
+        day = next_trading_day(day)
+
+    while True:
+        for boundary in get_bar_closes(day, bar_minutes):
+            if boundary > now:
+                return boundary
+        day = next_trading_day(day)
+
+
+def get_batch_time(day: date, delay_minutes: int = 60) -> datetime:
+    """
+    해당 거래일 배치 실행 시각 = 폐장 시각 + delay_minutes (조기 폐장일이면 더 이르게)
+    """
+    session = get_session(day)
+    if session is None:
+        raise ValueError(f"{day}는 거래일이 아님")
+    return session[1] + timedelta(minutes=delay_minutes)